@@ -1,34 +1,57 @@
+import atexit
 import logging
 import os
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from PySide6.QtCore import QCoreApplication, Qt
 from PySide6.QtWidgets import QApplication
 from src.core.launcher import Launcher
 
+# Resolved once from the executable (or this file) so paths don't depend on the cwd
+ROOT_DIR = os.path.dirname(
+    sys.executable if getattr(sys, "frozen", False) else os.path.abspath(__file__)
+)
+LOGS_DIR = os.path.join(ROOT_DIR, "logs")
+
 
 def main():
-    set_logging()
+    listener = set_logging()
+    # Must be set before the application object is created
+    QCoreApplication.setAttribute(Qt.ApplicationAttribute.AA_DontCreateNativeWidgetSiblings)
+    QCoreApplication.setAttribute(Qt.ApplicationAttribute.AA_CompressHighFrequencyEvents)
     app = QApplication([])
-    import sys
-
-    root_dir = os.path.dirname(
-        sys.executable if getattr(sys, "frozen", False) else os.path.abspath(__file__)
-    )
-    launcher = Launcher(root_dir)
+    launcher = Launcher(ROOT_DIR)
     launcher.start()
-    app.exec()
+    exit_code = app.exec()
+    if not launcher.shutdown():
+        # A task is stuck (e.g. a hung subprocess); the interpreter would wait
+        # on its thread forever, so flush the logs and leave without it
+        listener.stop()
+        os._exit(exit_code)
+    return exit_code
 
 
 def set_logging():
-    os.makedirs("logs", exist_ok=True)
+    os.makedirs(LOGS_DIR, exist_ok=True)
+    # Records are formatted by the QueueHandler and written to the stream and
+    # the log file by a background listener, so the UI thread never blocks on I/O
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(
+        log_queue,
+        logging.StreamHandler(),
+        logging.FileHandler(os.path.join(LOGS_DIR, "latest.log"), encoding="utf-8", mode="a"),
+    )
     logging.basicConfig(
         level=logging.DEBUG,
         datefmt="%H:%M:%S",
         format="[%(levelname)s] [%(asctime)s]: %(message)s",
-        handlers=[
-            logging.StreamHandler(),
-            logging.FileHandler("logs/latest.log", encoding="utf-8", mode="a"),
-        ],
+        handlers=[QueueHandler(log_queue)],
     )
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -1,54 +1,138 @@
-import os
-import sys
 import logging
-import signal
-from PySide6.QtCore import QThread, QCoreApplication, Signal
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import cached_property
+from PySide6.QtCore import QCoreApplication
 
-from ..ui.components.update_dialog import UpdateDialog
 from ..services.ui_service import UIService
-from ..services.launcher_service import LauncherService
-from ..services.profile_service import ProfileService
-from ..services.java_service import JavaService
-from ..services.loader_service import LoaderService
-from ..services.instance_service import InstanceService
-from ..services.file_service import FileService
-from ..services.game_service import GameService
-from ..version import __version__
+
+# Seconds shutdown() waits for background work before giving up on it
+SHUTDOWN_TIMEOUT = 10
+# Background tasks submitted by start(): the updater, the update checks and
+# the version JSON prefetch
+STARTUP_TASKS = 3
 
 
 class Launcher:
     def __init__(self, root_dir: str):
         logging.info("Initializing Launcher...")
-        self.minecraft_dir = os.path.join(os.getenv("APPDATA", ""), ".minecraft")
         self.root_dir = root_dir
 
+        # Only the UI is needed before the main window paints, the other
+        # services are imported and built on first use
         self.ui_service = UIService()
 
-        self.file_service = FileService()
+        # Background work runs here so the UI thread stays responsive; one
+        # worker per startup task plus one for the launch, so a quick launch
+        # isn't queued behind them
+        self._executor = ThreadPoolExecutor(max_workers=STARTUP_TASKS + 1)
+        self._pending = set()
+        self._pending_lock = threading.Lock()
+        self._update_check = None
+
+    @cached_property
+    def file_service(self):
+        from ..services.file_service import FileService
+
+        return FileService()
+
+    @cached_property
+    def profile_service(self):
+        from ..services.profile_service import ProfileService
+
+        return ProfileService(self.root_dir)
+
+    @cached_property
+    def java_service(self):
+        from ..services.java_service import JavaService
+
+        return JavaService()
+
+    @cached_property
+    def game_service(self):
+        from ..services.game_service import GameService
 
-        self.profile_service = ProfileService(self.root_dir)
-        self.java_service = JavaService()
-        self.game_service = GameService(self.root_dir)
-        self.loader_service = LoaderService(self.root_dir)
-        self.instance_service = InstanceService(self.root_dir)
-        self.launcher_service = LauncherService(
+        return GameService(self.root_dir)
+
+    @cached_property
+    def loader_service(self):
+        from ..services.loader_service import LoaderService
+
+        return LoaderService(self.root_dir)
+
+    @cached_property
+    def instance_service(self):
+        from ..services.instance_service import InstanceService
+
+        return InstanceService(self.root_dir)
+
+    @cached_property
+    def launcher_service(self):
+        from ..services.launcher_service import LauncherService
+
+        return LauncherService(
             self.root_dir, self.game_service.game, self.loader_service.loader
         )
 
+    @cached_property
+    def _update_checks(self):
+        # Component name -> (service, update check), built once
+        return {
+            "profile": (self.profile_service, self.profile_service._is_update_required),
+            "java": (self.java_service, lambda: any(self.java_service._is_update_required())),
+            "loader": (self.loader_service, self.loader_service._is_update_required),
+        }
+
     def start(self):
         self.main_window = self.ui_service.show_main()
+        self._report_progress = self.ui_service.get_progress_callback()
         # self.launcher_service.update()
+        # Download the updater in the background so the window paints right away
+        self._submit(self._replace_updater)
+        # Start the update checks now so they are usually done by the time Launch is pressed
+        self._update_check = self._submit(self.get_pending_updates)
+        # The game install and the launch both need the vanilla version JSON
+        self._submit(self._prefetch_version_json)
         self.main_window.on_launch_button_clicked(self.launch)
 
+    def _replace_updater(self):
+        # Resolved here rather than in start() so LauncherService and the
+        # services it depends on are imported and built on the worker thread
+        self.launcher_service.replace_updater()
+
+    def _prefetch_version_json(self):
+        try:
+            self.game_service.get_version_json()
+        except Exception as e:
+            # Not fatal here, the launch fetches it again
+            logging.warning("Failed to prefetch the version JSON: %s", e)
+
     def launch(self):
         self.main_window.set_launch_button_enabled(False)
+        self._submit(self._update_and_launch)
+
+    def _update_and_launch(self):
         self.main_window.set_launch_button_text("Updating...")
-        self.profile_service.update()
-        self.java_service.update()
-        self.loader_service.update()
-        self.game_service.update()
-        self.instance_service.update()
+        self._report_progress(0, "Checking for updates")
+        # The startup checks only hold for the first launch, retries check again
+        update_check, self._update_check = self._update_check, None
+        if update_check is not None:
+            pending_updates = update_check.result()
+        else:
+            pending_updates = self.get_pending_updates()
+        if pending_updates:
+            self._report_progress(10, "Updating", ", ".join(pending_updates))
+        # Instance files come from GitHub and don't depend on the loader or the
+        # game install, so sync them while the install chain runs
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [
+                executor.submit(self._update_install, pending_updates),
+                executor.submit(self.instance_service.update, self._report_progress),
+            ]
+            for future in futures:
+                future.result()
         self.main_window.set_launch_button_text("Launching...")
+        self._report_progress(90, "Launching")
         game_launched = self.launcher_service.launch_game()
 
         if game_launched:
@@ -57,19 +141,79 @@ class Launcher:
         else:
             logging.error("Failed to launch Minecraft")
             # Re-enable button after failed launch
-            if hasattr(self, "ui_service") and hasattr(self.ui_service, "main_window"):
-                main_window = self.ui_service.main_window
-                if hasattr(main_window, "launch_button"):
-                    main_window.launch_button.setEnabled(True)
-                    main_window.launch_button.setText("Launch")
+            self.main_window.reset_launch_button()
+
+    def _update_install(self, pending_updates):
+        # The loader installer needs the profile and Java, and it writes to the
+        # same libraries folder as the game install, so these run in order
+        for service in pending_updates.values():
+            service.update()
+        self.game_service.update()
+
+    def get_pending_updates(self):
+        """Check every versioned component once and return the outdated ones by name"""
+        # The checks are independent (file reads, a java subprocess), so run them together
+        with ThreadPoolExecutor(max_workers=len(self._update_checks)) as executor:
+            results = {
+                name: executor.submit(is_update_required)
+                for name, (_, is_update_required) in self._update_checks.items()
+            }
+        pending_updates = {}
+        for name, (service, _) in self._update_checks.items():
+            if results[name].result():
+                pending_updates[name] = service
+        if pending_updates:
+            logging.info("Updates required for: %s", ", ".join(pending_updates))
+        else:
+            logging.info("All components are up to date")
+        return pending_updates
+
+    def shutdown(self):
+        """Cancel queued background work and wait for anything still running
+
+        Returns False if the work didn't stop within SHUTDOWN_TIMEOUT.
+        """
+        from ..utils import file_utils
+
+        # Running downloads stop at their next chunk instead of finishing the
+        # file, so the wait below doesn't wait on the network
+        file_utils.cancel_downloads()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        with self._pending_lock:
+            pending = set(self._pending)
+        if not pending:
+            return True
+        logging.info("Waiting for %d background task(s) to finish", len(pending))
+        _, not_done = wait(pending, timeout=SHUTDOWN_TIMEOUT)
+        if not_done:
+            logging.warning(
+                "%d background task(s) still running after %ss",
+                len(not_done),
+                SHUTDOWN_TIMEOUT,
+            )
+            return False
+        return True
+
+    def _submit(self, fn, *args):
+        future = self._executor.submit(fn, *args)
+        with self._pending_lock:
+            self._pending.add(future)
+        future.add_done_callback(self._on_task_done)
+        return future
+
+    def _on_task_done(self, future):
+        with self._pending_lock:
+            self._pending.discard(future)
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            logging.error("Background task failed: %s", error)
+            self.main_window.reset_launch_button()
 
     def exit(self):
         logging.info("Exiting the launcher")
-        self.ui_service.main_window.close()
-        # Ensure Qt event loop and process exit
+        # Closing the window ends app.exec(), after which main() calls shutdown()
+        # to cancel and join the background work before the process exits
+        self.main_window.request_close()
         QCoreApplication.quit()
-        try:
-            sys.exit(0)
-        finally:
-            # As a last resort, force kill the process
-            os.kill(os.getpid(), signal.SIGTERM)
@@ -0,0 +1,21 @@
+from types import MappingProxyType
+
+# Folders under the launcher root, shared by the services
+INSTANCE_DIR = "instance"
+DOWNLOADS_DIR = "downloads"
+
+# GitHub repositories the launcher syncs from, shared read-only by the services
+CLIENT_REPO = MappingProxyType(
+    {
+        "name": "facufierro/FFTClientMinecraft1211",
+        "url": "https://github.com/facufierro/FFTClientMinecraft1211",
+        "branch": "main",
+    }
+)
+SERVER_REPO = MappingProxyType(
+    {
+        "name": "facufierro/FFTServerMinecraft1211",
+        "url": "https://github.com/facufierro/FFTServerMinecraft1211",
+        "branch": "main",
+    }
+)
@@ -1,29 +1,47 @@
 import os
-from dataclasses import dataclass, field
-from typing import Optional, List, Dict
+from dataclasses import dataclass
+from functools import cached_property
 
 
+# Not slotted: the derived paths below are cached in the instance __dict__
 @dataclass
 class Instance:
     instance_dir: str
-    defaultconfigs_dir: str = field(init=False)
-    config_dir: str = field(init=False)
-    kubejs_dir: str = field(init=False)
-    modflared_dir: str = field(init=False)
-    mods_dir: str = field(init=False)
-    resourcepacks_dir: str = field(init=False)
-    shaders_dir: str = field(init=False)
-    servers_file: Optional[str] = field(init=False)
-    mod_list: List[str] = field(default_factory=list)
-    resourcepacks: List[Dict[str, str]] = field(default_factory=list)
-    shaders: List[Dict[str, str]] = field(default_factory=list)
-
-    def __post_init__(self):
-        self.defaultconfigs_dir = os.path.join(self.instance_dir, "defaultconfigs")
-        self.config_dir = os.path.join(self.instance_dir, "config")
-        self.kubejs_dir = os.path.join(self.instance_dir, "kubejs")
-        self.modflared_dir = os.path.join(self.instance_dir, "modflared")
-        self.mods_dir = os.path.join(self.instance_dir, "mods")
-        self.resourcepacks_dir = os.path.join(self.instance_dir, "resourcepacks")
-        self.shaders_dir = os.path.join(self.instance_dir, "shaderpacks")
-        self.servers_file = os.path.join(self.instance_dir, "servers.dat")
+    # Empty tuples are shared, so the defaults cost no allocation per instance
+    mod_list: tuple[str, ...] = ()
+    resourcepacks: tuple[dict[str, str], ...] = ()
+    shaders: tuple[dict[str, str], ...] = ()
+
+    # Derived paths are built on first access; fixed child names under a known
+    # folder, so plain concatenation is enough and skips os.path.join's parsing
+    @cached_property
+    def defaultconfigs_dir(self) -> str:
+        return f"{self.instance_dir}{os.sep}defaultconfigs"
+
+    @cached_property
+    def config_dir(self) -> str:
+        return f"{self.instance_dir}{os.sep}config"
+
+    @cached_property
+    def kubejs_dir(self) -> str:
+        return f"{self.instance_dir}{os.sep}kubejs"
+
+    @cached_property
+    def modflared_dir(self) -> str:
+        return f"{self.instance_dir}{os.sep}modflared"
+
+    @cached_property
+    def mods_dir(self) -> str:
+        return f"{self.instance_dir}{os.sep}mods"
+
+    @cached_property
+    def resourcepacks_dir(self) -> str:
+        return f"{self.instance_dir}{os.sep}resourcepacks"
+
+    @cached_property
+    def shaders_dir(self) -> str:
+        return f"{self.instance_dir}{os.sep}shaderpacks"
+
+    @cached_property
+    def servers_file(self) -> str:
+        return f"{self.instance_dir}{os.sep}servers.dat"
@@ -1,26 +1,36 @@
 import os
-from dataclasses import dataclass, field
+from dataclasses import dataclass
+from functools import cached_property
 from ..version import __loader_version__
 
 
+# Not slotted: the derived values below are cached in the instance __dict__
 @dataclass
 class Loader:
     instance_dir: str
     downloads_dir: str
     required_version: str = __loader_version__
-    download_url: str = field(init=False)
-    installer: str = field(init=False)
-    launcher: str = field(init=False)
 
-    def __post_init__(self):
-        self.download_url = f"https://maven.neoforged.net/releases/net/neoforged/neoforge/{self.required_version}/neoforge-{self.required_version}-installer.jar"
-        self.installer = os.path.join(
+    # Built on first access, most callers only need one or two of these
+    @cached_property
+    def download_url(self) -> str:
+        return f"https://maven.neoforged.net/releases/net/neoforged/neoforge/{self.required_version}/neoforge-{self.required_version}-installer.jar"
+
+    @cached_property
+    def installer(self) -> str:
+        return os.path.join(
             self.downloads_dir, f"neoforge-{self.required_version}-installer.jar"
         )
-        self.launcher_dir = os.path.join(
+
+    @cached_property
+    def launcher_dir(self) -> str:
+        return os.path.join(
             self.instance_dir, "versions", f"neoforge-{self.required_version}"
         )
-        self.launcher = os.path.join(
+
+    @cached_property
+    def launcher(self) -> str:
+        return os.path.join(
             self.launcher_dir,
             f"neoforge-{self.required_version}.jar",
         )
@@ -1,15 +1,30 @@
-import json
 import logging
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import webbrowser
 import urllib.parse
+from collections import namedtuple
+import threading
 import time
 from pathlib import Path
+from ..utils import json_utils
+
+# What the game launch needs from the login
+AuthInfo = namedtuple('AuthInfo', 'username uuid access_token xuid client_id')
+
+# Seconds a positive is_authenticated() result is reused without checking again
+AUTH_CHECK_TTL = 10
+
+# Hosts of the token chain after the Microsoft login, in the order they are used
+XBOX_HOST = 'https://user.auth.xboxlive.com'
+XSTS_HOST = 'https://xsts.auth.xboxlive.com'
+MINECRAFT_HOST = 'https://api.minecraftservices.com'
 
 class AuthService:
     """Microsoft authentication for Minecraft using vanilla launcher credentials"""
     
-    def __init__(self):
+    def __init__(self, root_dir: str):
         # Use the exact same credentials as the vanilla Minecraft launcher
         self.client_id = "00000000402b5328"
         self.redirect_uri = "https://login.live.com/oauth20_desktop.srf"
@@ -18,26 +33,65 @@ class AuthService:
         # Microsoft OAuth endpoints
         self.auth_url = "https://login.live.com/oauth20_authorize.srf"
         self.token_url = "https://login.live.com/oauth20_token.srf"
+        # Device code logins are issued (and refreshed) by the v2 endpoint
+        self.device_token_url = "https://login.microsoftonline.com/consumers/oauth2/v2.0/token"
         
-        self.auth_data_file = Path("auth_data.json")
+        # One session for the whole token chain, so each host's connection
+        # (and TLS session) is reused instead of renegotiated per request.
+        # Transient errors are retried; urllib3 only re-sends idempotent
+        # methods, so the token POSTs are never submitted twice
+        self.session = requests.Session()
+        retries = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+        self.session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retries))
+        # Set by cancel_authentication() to stop a pending device code login
+        self._cancel = threading.Event()
+        
+        # Under the launcher root like the other services' files, not the cwd
+        self.auth_data_file = Path(root_dir, "auth_data.json")
+        # (mtime_ns, size) of auth_data.json when it was last read
+        self._auth_stat = None
+        self._expires_at = 0
+        self._valid_until = 0
+        # Built from auth_data on first use, cleared whenever auth_data changes
+        self._auth_info = None
         self.auth_data = self.load_auth_data()
     
     def load_auth_data(self):
         """Load saved authentication data"""
+        data = {}
         try:
-            if self.auth_data_file.exists():
-                with open(self.auth_data_file, 'r') as f:
-                    return json.load(f)
+            self._auth_stat = self._stat_auth_file()
+            if self._auth_stat is not None:
+                data = json_utils.load(self.auth_data_file)
         except Exception as e:
             logging.warning(f"Failed to load auth data: {e}")
-        return {}
+        self._expires_at = data.get('expires_at', 0)
+        self._valid_until = 0
+        self._auth_info = None
+        return data
+
+    def _stat_auth_file(self):
+        try:
+            stat = self.auth_data_file.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _reload_if_changed(self):
+        """Re-read auth_data.json only if it changed since it was last read or written"""
+        if self._stat_auth_file() != self._auth_stat:
+            self.auth_data = self.load_auth_data()
     
     def save_auth_data(self, data):
         """Save authentication data"""
         try:
-            with open(self.auth_data_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            # Written atomically, and skipped when nothing changed
+            json_utils.dump(data, self.auth_data_file)
             self.auth_data = data
+            self._expires_at = data.get('expires_at', 0)
+            self._valid_until = 0
+            self._auth_info = None
+            self._auth_stat = self._stat_auth_file()
         except Exception as e:
             logging.error(f"Failed to save auth data: {e}")
     
@@ -48,13 +102,23 @@ class AuthService:
                 logging.info("Using cached authentication")
                 return True
 
+            # An expired login is renewed with the refresh token when there is
+            # one, without sending the user through the device code prompt
+            refresh_token = (self.auth_data or {}).get('ms_token', {}).get('refresh_token')
+            if refresh_token:
+                ms_token = self._refresh_microsoft_token(refresh_token)
+                if ms_token and self._complete_minecraft_auth(ms_token):
+                    return True
+                logging.info("Could not refresh the login, signing in again")
+
+            self._cancel.clear()
             logging.info("Starting Microsoft device code authentication...")
             device_code_url = "https://login.microsoftonline.com/consumers/oauth2/v2.0/devicecode"
             data = {
                 'client_id': self.client_id,
                 'scope': self.scopes
             }
-            resp = requests.post(device_code_url, data=data)
+            resp = self.session.post(device_code_url, data=data)
             if resp.status_code != 200:
                 raise Exception(f"Failed to get device code: {resp.text}")
             device_data = resp.json()
@@ -75,22 +139,32 @@ class AuthService:
             except Exception as e:
                 logging.warning(f"Could not open browser automatically: {e}")
 
-            # Poll for token
-            token_url = "https://login.microsoftonline.com/consumers/oauth2/v2.0/token"
+            # Nothing else happens while the user signs in, so open the
+            # connections the token chain will need in the meantime
+            self._prewarm_connections(XBOX_HOST, XSTS_HOST, MINECRAFT_HOST)
+
+            # Poll for token at the interval the server asked for (the device
+            # flow forbids polling sooner), waking early only to cancel
             while True:
-                time.sleep(interval)
+                if self._cancel.wait(interval):
+                    logging.info("Authentication cancelled.")
+                    return False
                 poll_data = {
                     'grant_type': 'urn:ietf:params:oauth:grant-type:device_code',
                     'client_id': self.client_id,
                     'device_code': device_code
                 }
-                poll_resp = requests.post(token_url, data=poll_data)
+                poll_resp = self.session.post(self.device_token_url, data=poll_data)
                 if poll_resp.status_code == 200:
                     ms_token = poll_resp.json()
                     break
                 err = poll_resp.json()
                 if err.get('error') == 'authorization_pending':
                     continue
+                elif err.get('error') == 'slow_down':
+                    # Polled too often; the server wants the interval raised by 5s
+                    interval += 5
+                    continue
                 elif err.get('error') == 'authorization_declined':
                     logging.error("Authorization was declined by the user.")
                     return False
@@ -110,6 +184,10 @@ class AuthService:
             logging.error(f"Authentication failed: {e}")
             return False
     
+    def cancel_authentication(self):
+        """Stop a device code login that is waiting for the user"""
+        self._cancel.set()
+    
     def _create_auth_url(self):
         """Create Microsoft OAuth authorization URL"""
         params = {
@@ -130,18 +208,45 @@ class AuthService:
             'redirect_uri': self.redirect_uri
         }
         
-        response = requests.post(self.token_url, data=data)
+        response = self.session.post(self.token_url, data=data)
         
         if response.status_code != 200:
             raise Exception(f"Failed to get Microsoft token: {response.text}")
         
         return response.json()
     
+    def _refresh_microsoft_token(self, refresh_token):
+        """Exchange a refresh token for a new Microsoft access token, or None if it was refused"""
+        data = {
+            'client_id': self.client_id,
+            'grant_type': 'refresh_token',
+            'refresh_token': refresh_token,
+            'scope': self.scopes
+        }
+        try:
+            response = self.session.post(self.device_token_url, data=data)
+        except Exception as e:
+            logging.warning(f"Token refresh request failed: {e}")
+            return None
+        
+        if response.status_code != 200:
+            logging.warning(f"Token refresh was refused: {response.text}")
+            return None
+        
+        ms_token = response.json()
+        # Microsoft rotates refresh tokens; keep the old one if none came back
+        ms_token.setdefault('refresh_token', refresh_token)
+        return ms_token
+    
     def _complete_minecraft_auth(self, ms_token_data):
         """Complete the Minecraft authentication chain"""
         try:
             ms_access_token = ms_token_data['access_token']
             
+            # The steps depend on each other, but the connections to the later
+            # hosts can be opened while the Xbox request is running
+            self._prewarm_connections(XSTS_HOST, MINECRAFT_HOST)
+            
             # Get Xbox Live token
             xbox_token = self._get_xbox_token(ms_access_token)
             if not xbox_token:
@@ -180,6 +285,17 @@ class AuthService:
             logging.error(f"Failed to complete Minecraft authentication: {e}")
             return False
     
+    def _prewarm_connections(self, *hosts):
+        """Open pooled connections to hosts in the background, so later requests skip the handshake"""
+        def warm(host):
+            try:
+                self.session.head(host, timeout=5, allow_redirects=False)
+            except requests.RequestException as e:
+                logging.debug(f"Could not prewarm {host}: {e}")
+        
+        for host in hosts:
+            threading.Thread(target=warm, args=(host,), daemon=True).start()
+    
     def _get_xbox_token(self, ms_access_token):
         """Get Xbox Live token"""
         try:
@@ -193,8 +309,8 @@ class AuthService:
                 "TokenType": "JWT"
             }
             
-            response = requests.post(
-                'https://user.auth.xboxlive.com/user/authenticate',
+            response = self.session.post(
+                f'{XBOX_HOST}/user/authenticate',
                 json=data,
                 headers={'Content-Type': 'application/json'},
                 timeout=30
@@ -222,8 +338,8 @@ class AuthService:
                 "TokenType": "JWT"
             }
             
-            response = requests.post(
-                'https://xsts.auth.xboxlive.com/xsts/authorize',
+            response = self.session.post(
+                f'{XSTS_HOST}/xsts/authorize',
                 json=data,
                 headers={'Content-Type': 'application/json'},
                 timeout=30
@@ -246,8 +362,8 @@ class AuthService:
                 "identityToken": f"XBL3.0 x={xsts_data['DisplayClaims']['xui'][0]['uhs']};{xsts_data['Token']}"
             }
             
-            response = requests.post(
-                'https://api.minecraftservices.com/authentication/login_with_xbox',
+            response = self.session.post(
+                f'{MINECRAFT_HOST}/authentication/login_with_xbox',
                 json=data,
                 headers={'Content-Type': 'application/json'},
                 timeout=30
@@ -266,8 +382,8 @@ class AuthService:
     def _get_minecraft_profile(self, mc_token):
         """Get Minecraft profile"""
         try:
-            response = requests.get(
-                'https://api.minecraftservices.com/minecraft/profile',
+            response = self.session.get(
+                f'{MINECRAFT_HOST}/minecraft/profile',
                 headers={'Authorization': f'Bearer {mc_token}'},
                 timeout=30
             )
@@ -284,18 +400,26 @@ class AuthService:
     
     def is_authenticated(self):
         """Check if user is authenticated with valid token"""
+        # The launch path asks several times in a row; a recent positive answer
+        # stands until AUTH_CHECK_TTL or the token expiry, whichever is first
+        now = time.time()
+        if now < self._valid_until:
+            return True
+        self._reload_if_changed()
         if not self.auth_data:
             return False
         
         # Check if token is expired
-        expires_at = self.auth_data.get('expires_at', 0)
-        if time.time() >= expires_at:
+        if now >= self._expires_at:
             logging.info("Authentication token expired")
             return False
         
         # Check if we have all required data
         required_fields = ['mc_token', 'profile']
-        return all(field in self.auth_data for field in required_fields)
+        if not all(field in self.auth_data for field in required_fields):
+            return False
+        self._valid_until = min(now + AUTH_CHECK_TTL, self._expires_at)
+        return True
     
     def get_minecraft_token(self):
         """Get the Minecraft access token"""
@@ -313,23 +437,29 @@ class AuthService:
         """Get authentication info for game launch"""
         if not self.is_authenticated():
             return None
-        
-        profile = self.get_profile()
-        xsts_data = self.auth_data.get('xsts_data', {})
-        
-        return {
-            'username': profile.get('name', 'Player'),
-            'uuid': profile.get('id', ''),
-            'access_token': self.get_minecraft_token(),
-            'xuid': xsts_data.get('uhs', ''),  # Xbox User Hash from XSTS data
-            'client_id': self.client_id
-        }
+        if self._auth_info is None:
+            profile = self.auth_data['profile']
+            xsts_data = self.auth_data.get('xsts_data') or {}
+            # Xbox User Hash from the XSTS display claims
+            xui = xsts_data.get('DisplayClaims', {}).get('xui') or [{}]
+            self._auth_info = AuthInfo(
+                username=profile.get('name', 'Player'),
+                uuid=profile.get('id', ''),
+                access_token=self.auth_data['mc_token'],
+                xuid=xui[0].get('uhs', ''),
+                client_id=self.client_id,
+            )
+        return self._auth_info
     
     def logout(self):
         """Clear authentication data"""
         self.auth_data = {}
+        self._expires_at = 0
+        self._valid_until = 0
+        self._auth_info = None
         try:
             if self.auth_data_file.exists():
                 self.auth_data_file.unlink()
         except Exception as e:
             logging.warning(f"Failed to delete auth data file: {e}")
+        self._auth_stat = self._stat_auth_file()
@@ -2,7 +2,17 @@ import logging
 import os
 import shutil
 import zipfile
+import zlib
 import io
+from concurrent.futures import ThreadPoolExecutor
+from ..utils.file_utils import atomic_write, zip_entry_path
+
+# Read/write size when copying zip entries out, instead of copyfileobj's small default
+COPY_BUFFER_SIZE = 1024 * 1024
+# zlib releases the GIL while inflating, so entries extract in parallel threads
+MAX_EXTRACT_WORKERS = min(8, os.cpu_count() or 1)
+# Zip sources held in memory rather than read from a path or file object
+ZIP_BUFFER_TYPES = (bytes, bytearray, memoryview)
 
 
 class FileService:
@@ -12,18 +22,9 @@ class FileService:
     def replace_files_in_folder(self, zip_file, target_folder):
         # replace files with the same name in target_folder with files from zip_file
         try:
-            logging.debug(f"Replacing files in {target_folder} with {zip_file}")
-            zf = io.BytesIO(zip_file) if isinstance(zip_file, bytes) else zip_file
-            with zipfile.ZipFile(zf, "r") as zip_ref:
-                for file_info in zip_ref.infolist():
-                    if file_info.is_dir():
-                        continue
-                    target_path = os.path.join(target_folder, file_info.filename)
-                    os.makedirs(os.path.dirname(target_path), exist_ok=True)
-                    with zip_ref.open(file_info) as source_file:
-                        with open(target_path, "wb") as target_file:
-                            shutil.copyfileobj(source_file, target_file)
-            logging.debug(f"Files replaced in {target_folder}")
+            logging.debug("Replacing files in %s with %s", target_folder, zip_file)
+            self._extract_changed(zip_file, target_folder)
+            logging.debug("Files replaced in %s", target_folder)
         except Exception as e:
             logging.error(f"Failed to replace files: {e}")
             raise
@@ -31,13 +32,18 @@ class FileService:
     def replace_folder(self, zip_file, target_folder):
         # replace the entire target_folder with files from zip_file
         try:
-            logging.debug(f"Replacing folder {target_folder} with {zip_file}")
-            if os.path.exists(target_folder):
-                shutil.rmtree(target_folder)
-            zf = io.BytesIO(zip_file) if isinstance(zip_file, bytes) else zip_file
-            with zipfile.ZipFile(zf, "r") as zip_ref:
-                zip_ref.extractall(target_folder)
-            logging.debug(f"Replaced folder: {target_folder}")
+            logging.debug("Replacing folder %s with %s", target_folder, zip_file)
+            # Only what differs is removed or rewritten, so replacing a folder
+            # with the same pack again doesn't inflate every entry
+            try:
+                self._sync_folder(zip_file, target_folder)
+            except (FileExistsError, IsADirectoryError, NotADirectoryError):
+                # A file where the zip has a folder (or the other way round)
+                if os.path.exists(target_folder):
+                    shutil.rmtree(target_folder)
+                with self._open_zip(zip_file) as zip_ref:
+                    zip_ref.extractall(target_folder)
+            logging.debug("Replaced folder: %s", target_folder)
         except Exception as e:
             logging.error(f"Failed to replace folder: {e}")
             raise
@@ -45,11 +51,11 @@ class FileService:
     def add_file_to_folder(self, file_path, target_folder):
         # add a file to the target folder
         try:
-            logging.debug(f"Adding file {file_path} to {target_folder}")
+            logging.debug("Adding file %s to %s", file_path, target_folder)
             if not os.path.exists(target_folder):
                 os.makedirs(target_folder)
             shutil.copy(file_path, target_folder)
-            logging.debug(f"Added file: {file_path} to {target_folder}")
+            logging.debug("Added file: %s to %s", file_path, target_folder)
         except Exception as e:
             logging.error(f"Failed to add file: {e}")
             raise
@@ -59,18 +65,9 @@ class FileService:
         if not os.path.exists(target_folder):
             os.makedirs(target_folder)
         try:
-            logging.debug(f"Adding files from {zip_file} to {target_folder}")
-            zf = io.BytesIO(zip_file) if isinstance(zip_file, bytes) else zip_file
-            with zipfile.ZipFile(zf, "r") as zip_ref:
-                for file_info in zip_ref.infolist():
-                    if file_info.is_dir():
-                        continue
-                    target_path = os.path.join(target_folder, file_info.filename)
-                    os.makedirs(os.path.dirname(target_path), exist_ok=True)
-                    with zip_ref.open(file_info) as source_file:
-                        with open(target_path, "wb") as target_file:
-                            shutil.copyfileobj(source_file, target_file)
-            logging.debug(f"Files added from {zip_file} to {target_folder}")
+            logging.debug("Adding files from %s to %s", zip_file, target_folder)
+            self._extract_changed(zip_file, target_folder)
+            logging.debug("Files added from %s to %s", zip_file, target_folder)
         except Exception as e:
             logging.error(f"Failed to add files: {e}")
             raise
@@ -78,12 +75,12 @@ class FileService:
     def replace_file(self, file_path, target_folder):
         # replace a file in the target folder
         try:
-            logging.debug(f"Replacing file {file_path} in {target_folder}")
+            logging.debug("Replacing file %s in %s", file_path, target_folder)
             if not os.path.exists(target_folder):
                 os.makedirs(target_folder)
             target_path = os.path.join(target_folder, os.path.basename(file_path))
             shutil.copy(file_path, target_path)
-            logging.debug(f"Replaced file: {file_path} in {target_folder}")
+            logging.debug("Replaced file: %s in %s", file_path, target_folder)
         except Exception as e:
             logging.error(f"Failed to replace file: {e}")
             raise
@@ -91,19 +88,103 @@ class FileService:
     def save_file_content(self, content, file_path):
         """Save content (bytes or text) to a file"""
         try:
-            logging.debug(f"Saving content to {file_path}")
+            logging.debug("Saving content to %s", file_path)
             # Create directory if it doesn't exist
             os.makedirs(os.path.dirname(file_path), exist_ok=True)
             
             # Write content based on type
             if isinstance(content, bytes):
-                with open(file_path, "wb") as f:
+                with atomic_write(file_path) as f:
                     f.write(content)
             else:
-                with open(file_path, "w", encoding="utf-8") as f:
+                with atomic_write(file_path, "w", encoding="utf-8") as f:
                     f.write(content)
             
-            logging.debug(f"Saved content to {file_path}")
+            logging.debug("Saved content to %s", file_path)
         except Exception as e:
             logging.error(f"Failed to save content to {file_path}: {e}")
             raise
+
+    def _sync_folder(self, zip_file, target_folder):
+        # Make target_folder hold exactly the zip's contents, as a fresh extraction would
+        with self._open_zip(zip_file) as zip_ref:
+            names = zip_ref.namelist()
+        # Entries that would land outside target_folder are ignored, as
+        # extractall does
+        paths = [
+            path for path in (zip_entry_path(target_folder, name) for name in names) if path
+        ]
+        keep = {os.path.normpath(path) for path in paths}
+        # Files and folders the zip doesn't have go first, deepest first
+        for root, dirs, files in os.walk(target_folder, topdown=False):
+            for name in files:
+                path = os.path.join(root, name)
+                if os.path.normpath(path) not in keep:
+                    os.remove(path)
+            for name in dirs:
+                path = os.path.join(root, name)
+                if os.path.normpath(path) not in keep and not os.listdir(path):
+                    os.rmdir(path)
+        self._extract_changed(zip_file, target_folder)
+        # Folder entries, which _extract_changed doesn't create when empty
+        for name in names:
+            path = zip_entry_path(target_folder, name)
+            if path and name.endswith("/"):
+                os.makedirs(path, exist_ok=True)
+
+    def _extract_changed(self, zip_file, target_folder):
+        # Write every entry that differs from the file already in target_folder
+        # Entries with absolute names or ".." are skipped, so nothing is
+        # written outside target_folder
+        with self._open_zip(zip_file) as zip_ref:
+            entries = [
+                (info, path)
+                for info in zip_ref.infolist()
+                if not info.is_dir()
+                and (path := zip_entry_path(target_folder, info.filename)) is not None
+            ]
+        if not entries:
+            return
+        # Create each folder once up front, so the workers don't race on it
+        folders = {os.path.dirname(path) for _, path in entries}
+        for folder in folders:
+            os.makedirs(folder, exist_ok=True)
+
+        def extract(chunk):
+            # ZipFile isn't safe to share between threads, each worker opens its own
+            with self._open_zip(zip_file) as zip_ref:
+                for file_info, target_path in chunk:
+                    if self._is_unchanged(target_path, file_info):
+                        continue
+                    with zip_ref.open(file_info) as source_file:
+                        with open(target_path, "wb") as target_file:
+                            shutil.copyfileobj(source_file, target_file, COPY_BUFFER_SIZE)
+
+        # An open file object can't be read from several threads at once
+        reopenable = isinstance(zip_file, (*ZIP_BUFFER_TYPES, str, os.PathLike))
+        workers = min(MAX_EXTRACT_WORKERS, len(entries)) if reopenable else 1
+        if workers == 1:
+            extract(entries)
+            return
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(extract, [entries[i::workers] for i in range(workers)]))
+
+    @staticmethod
+    def _open_zip(source):
+        # Zips arrive as in-memory bytes (downloads) or as paths/file objects
+        if isinstance(source, ZIP_BUFFER_TYPES):
+            source = io.BytesIO(source)
+        return zipfile.ZipFile(source, "r")
+
+    def _is_unchanged(self, target_path, file_info):
+        # An existing file with the same size and CRC-32 as the zip entry doesn't need rewriting
+        try:
+            if os.path.getsize(target_path) != file_info.file_size:
+                return False
+            crc = 0
+            with open(target_path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    crc = zlib.crc32(chunk, crc)
+            return crc == file_info.CRC
+        except OSError:
+            return False
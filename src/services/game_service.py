@@ -1,19 +1,49 @@
 import logging
-import json
+import os
 import requests
-import zipfile
 from tqdm import tqdm
 from pathlib import Path
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from ..models.constants import INSTANCE_DIR
 from ..models.game import Game
-from ..utils import file_utils, version_utils
+from ..utils import file_utils, json_utils, version_utils
+
+
+def _progress(tasks, desc):
+    """Iterate futures as they complete behind a progress bar that redraws at most ~100 times"""
+    # Redrawing on every completion costs a terminal write per file
+    return tqdm(
+        as_completed(tasks),
+        total=len(tasks),
+        desc=desc,
+        miniters=max(1, len(tasks) // 100),
+        mininterval=0.1,
+        smoothing=0,
+    )
+
+
+def _existing_objects(objects_dir):
+    """Return the names of the asset objects already on disk"""
+    # One directory listing per hash prefix (at most 256) instead of a stat
+    # per asset
+    existing = set()
+    try:
+        with os.scandir(objects_dir) as prefixes:
+            for prefix in prefixes:
+                if prefix.is_dir():
+                    with os.scandir(prefix.path) as entries:
+                        existing.update(e.name for e in entries)
+    except FileNotFoundError:
+        pass
+    return existing
 
 
 class GameService:
     def __init__(self, root_dir: str):
         self.root_dir = Path(root_dir)
-        self.instance_dir = Path(self.root_dir, "instance")
+        self.instance_dir = Path(self.root_dir, INSTANCE_DIR)
         self.indexes_dir = Path(self.instance_dir, "assets", "indexes")
+        self.cache_dir = Path(self.instance_dir, "cache")
         self.game = Game()
 
     def update(self):
@@ -24,8 +54,7 @@ class GameService:
             # Validate asset index
             index_path = self.indexes_dir / f"{self.game.version}.json"
             try:
-                with open(index_path, 'r') as f:
-                    data = json.load(f)
+                data = json_utils.load(index_path)
                 if "objects" not in data or not isinstance(data["objects"], dict) or not data["objects"]:
                     logging.warning("[ASSETS] Asset index exists but is invalid or empty. Forcing re-download.")
                     index_path.unlink(missing_ok=True)
@@ -41,26 +70,48 @@ class GameService:
         logging.debug("Checking if game update is required")
         return not (self.indexes_dir / f"{self.game.version}.json").exists()
 
+    def get_version_json(self):
+        """Vanilla version JSON, cached in memory and under instance/cache"""
+        return version_utils.get_version_json(self.game.version, self.cache_dir)
+
     def _install(self, target_dir):
-        vjson = version_utils.get_version_json(self.game.version)
-        client_url = vjson["downloads"]["client"]["url"]
+        vjson = self.get_version_json()
+        client = vjson["downloads"]["client"]
         client_jar = target_dir / f"minecraft-{self.game.version}.jar"
-        file_utils.download_file(client_url, client_jar)
         libs_dir = target_dir / "libraries"
         natives_dir = target_dir / "natives"
-        natives_dir.mkdir(exist_ok=True)
+        natives_dir.mkdir(parents=True, exist_ok=True)
+        assets_dir = target_dir / "assets"
         lib_tasks = []
         native_tasks = []
         native_files = []
-        with ThreadPoolExecutor(max_workers=8) as executor:
+        asset_tasks = []
+        failed_assets = []
+        # One pool for the client jar, libraries, natives and assets: they come
+        # from different hosts, so assets start while the libraries download
+        with ThreadPoolExecutor(max_workers=file_utils.MAX_POOL_SIZE) as executor:
+            client_task = executor.submit(
+                file_utils.download_file,
+                client["url"],
+                client_jar,
+                sha1=client.get("sha1"),
+                size=client.get("size"),
+            )
             for lib in vjson["libraries"]:
                 # Download main jar
                 if "downloads" in lib and "artifact" in lib["downloads"]:
-                    url = lib["downloads"]["artifact"]["url"]
-                    path = libs_dir / Path(lib["downloads"]["artifact"]["path"])
+                    artifact = lib["downloads"]["artifact"]
+                    path = libs_dir / Path(artifact["path"])
                     if not path.exists():
                         lib_tasks.append(
-                            executor.submit(file_utils.download_file, url, path, False)
+                            executor.submit(
+                                file_utils.download_file,
+                                artifact["url"],
+                                path,
+                                False,
+                                sha1=artifact.get("sha1"),
+                                size=artifact.get("size"),
+                            )
                         )
                 # Download and extract natives if present
                 if "downloads" in lib and "classifiers" in lib["downloads"] and "natives" in lib:
@@ -81,66 +132,81 @@ class GameService:
                         native_path = libs_dir / Path(native_info["path"])
                         if not native_path.exists():
                             native_tasks.append(
-                                executor.submit(file_utils.download_file, native_url, native_path, False)
+                                executor.submit(
+                                    file_utils.download_file,
+                                    native_url,
+                                    native_path,
+                                    False,
+                                    sha1=native_info.get("sha1"),
+                                    size=native_info.get("size"),
+                                )
                             )
                         native_files.append(native_path)
-            # Wait for library downloads
-            for f in tqdm(
-                as_completed(lib_tasks),
-                total=len(lib_tasks),
-                desc="Libraries",
-                unit="lib",
-            ):
-                pass
-            # Wait for native downloads
-            for f in tqdm(
-                as_completed(native_tasks),
-                total=len(native_tasks),
-                desc="Natives",
-                unit="native",
-            ):
-                pass
-        # Extract native files (zip/jar) to natives_dir
-        for native_path in native_files:
+            # The asset index is fetched here while the pool works on the jars
+            asset_index = vjson["assetIndex"]
+            assets_index_url = asset_index["url"]
+            assets_index_path = assets_dir / "indexes" / f"{self.game.version}.json"
+            logging.info("[ASSETS] Downloading asset index: %s -> %s", assets_index_url, assets_index_path)
+            # Parsed from memory and written only once the client jar and the
+            # libraries are in place, since the file marks the game as installed
+            assets = None
             try:
-                with zipfile.ZipFile(native_path, 'r') as zf:
-                    zf.extractall(natives_dir)
-                logging.info(f"[NATIVES] Extracted {native_path} to {natives_dir}")
+                content = file_utils.download_bytes(
+                    assets_index_url, sha1=asset_index.get("sha1"), size=asset_index.get("size")
+                )
+                assets = json_utils.loads(content)["objects"]
+                logging.info("[ASSETS] Asset index loaded, %d assets found.", len(assets))
             except Exception as e:
-                logging.error(f"[NATIVES] Failed to extract {native_path}: {e}")
-        assets_dir = target_dir / "assets"
-        assets_index_url = vjson["assetIndex"]["url"]
-        assets_index_path = assets_dir / "indexes" / f"{self.game.version}.json"
-        logging.info(f"[ASSETS] Downloading asset index: {assets_index_url} -> {assets_index_path}")
-        file_utils.download_file(assets_index_url, assets_index_path)
-        try:
-            with open(assets_index_path) as f:
-                assets = json.load(f)["objects"]
-            logging.info(f"[ASSETS] Asset index loaded, {len(assets)} assets found.")
-        except Exception as e:
-            logging.error(f"[ASSETS] Failed to load asset index: {e}")
-            return
-        asset_tasks = []
-        failed_assets = []
-        with ThreadPoolExecutor(max_workers=16) as executor:
-            for name, obj in assets.items():
-                h = obj["hash"]
-                url = f"https://resources.download.minecraft.net/{h[:2]}/{h}"
-                path = assets_dir / "objects" / h[:2] / h
-                if not path.exists():
-                    asset_tasks.append(executor.submit(file_utils.download_file, url, path, False))
+                logging.error(f"[ASSETS] Failed to load asset index: {e}")
+            if assets is not None:
+                objects_dir = assets_dir / "objects"
+                existing = _existing_objects(objects_dir)
+                for name, obj in assets.items():
+                    h = obj["hash"]
+                    if h not in existing:
+                        url = f"https://resources.download.minecraft.net/{h[:2]}/{h}"
+                        path = objects_dir / h[:2] / h
+                        # Assets are named by their SHA-1
+                        asset_tasks.append(
+                            executor.submit(
+                                file_utils.download_file, url, path, False, sha1=h, size=obj.get("size")
+                            )
+                        )
+                        # Many names share one hash, download each object once
+                        existing.add(h)
+            try:
+                # Wait for library downloads
+                for f in _progress(lib_tasks, "Libraries"):
+                    f.result()
+                # Wait for native downloads
+                for f in _progress(native_tasks, "Natives"):
+                    f.result()
+                # Extract native files (zip/jar) to natives_dir, assets keep downloading
+                try:
+                    extracted = file_utils.extract_archives(native_files, natives_dir)
+                    logging.info("[NATIVES] Extracted %d files to %s", extracted, natives_dir)
+                except Exception as e:
+                    logging.error(f"[NATIVES] Failed to extract natives: {e}")
+                client_task.result()
+            except BaseException:
+                # The install has failed, so don't make the error wait for
+                # thousands of queued assets
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
             for future in as_completed(asset_tasks):
                 try:
                     future.result()
                 except Exception as e:
                     failed_assets.append(str(e))
+        if assets is None:
+            return
+        assets_index_path.parent.mkdir(parents=True, exist_ok=True)
+        with file_utils.atomic_write(assets_index_path) as f:
+            f.write(content)
         if failed_assets:
-            print(f"[ASSETS] {len(failed_assets)} assets failed to download:")
-            for err in failed_assets:
-                print(f"  {err}")
-            # Write to a log file
-            log_path = Path("assets_failed.log")
-            with open(log_path, "w", encoding="utf-8") as logf:
-                logf.write(f"[ASSETS] {len(failed_assets)} assets failed to download:\n")
-                for err in failed_assets:
-                    logf.write(f"  {err}\n")
+            # Goes to the launcher log under the root's logs folder
+            logging.error(
+                "[ASSETS] %d assets failed to download:\n  %s",
+                len(failed_assets),
+                "\n  ".join(failed_assets),
+            )
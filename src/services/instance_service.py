@@ -1,130 +1,170 @@
 import logging
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from ..models.constants import CLIENT_REPO, INSTANCE_DIR, SERVER_REPO
 from ..models.instance import Instance
-from ..utils import file_utils, github_utils
+from ..utils import file_utils, github_utils, json_utils
 from pathlib import Path
 
+# Above this many changed files, a repo is fetched as one archive instead of file by file
+ARCHIVE_THRESHOLD = 50
+# Managed by the Connector mod itself, never synced
+CONNECTOR_DIR = ".connector"
+CONNECTOR_PREFIX = f"mods/{CONNECTOR_DIR}/"
+
 
 class InstanceService:
     def __init__(self, root_dir: str):
         logging.debug("Initializing InstanceService")
-        self.instance_dir = os.path.join(root_dir, "instance")
+        self.instance_dir = os.path.join(root_dir, INSTANCE_DIR)
         self.instance = Instance(instance_dir=self.instance_dir)
         self._create_instance_folder()
-        self.client_repo = {
-            "name": "facufierro/FFTClientMinecraft1211",
-            "url": "https://github.com/facufierro/FFTClientMinecraft1211",
-            "branch": "main",
-        }
-        self.server_repo = {
-            "name": "facufierro/FFTServerMinecraft1211",
-            "url": "https://github.com/facufierro/FFTServerMinecraft1211",
-            "branch": "main",
+        # Client repo path -> local destination, for the fresh install and the sync
+        self.client_targets = {
+            "defaultconfigs": self.instance.config_dir,
+            "modflared": self.instance.modflared_dir,
+            "mods": self.instance.mods_dir,
+            "servers.dat": self.instance.servers_file,
         }
+        self.progress_callback = None
+        # Repo-relative path -> mtime, size and git blob SHA of the local copy
+        self.index_file = os.path.join(self.instance_dir, ".fftlauncher_index.json")
+        self._index = {}
+        self._index_changed = False
+        self._index_lock = threading.Lock()
+        # Repo name -> commit SHA the instance was last synced to
+        self.sync_state_file = os.path.join(self.instance_dir, ".fft_sync.json")
+        self.client_repo = CLIENT_REPO
+        self.server_repo = SERVER_REPO
+        # Repo name -> head commit SHA of this sync. Files are fetched by commit
+        # rather than by branch, which the raw and codeload CDNs may serve stale
+        self._heads = {}
 
-    def update(self):
-        self.update_config()
-        self.update_kubejs()
-        self.update_modflared()
-        self.update_mods()
+    def update(self, progress_callback=None):
+        self.progress_callback = progress_callback
+        heads = self._heads = self._get_head_shas()
+        if self._is_fresh_install():
+            # Nothing is installed yet, so fetch the whole client repo as one
+            # archive instead of one request per file
+            state = {}
+            updates = {
+                self.client_repo["name"]: self.install_client_files,
+                self.server_repo["name"]: self.update_kubejs,
+            }
+        else:
+            # A repo whose head hasn't moved since the last successful sync is
+            # skipped without listing or hashing anything
+            state = self._load_sync_state()
+            updates = {
+                repo["name"]: update
+                for repo, update in (
+                    (self.client_repo, self.update_client_files),
+                    (self.server_repo, self.update_kubejs),
+                )
+                if heads[repo["name"]] is None
+                or state.get(repo["name"], {}).get("sha") != heads[repo["name"]]
+            }
+            if not updates:
+                logging.info("Instance files are up to date")
+                return
+        self._load_index()
+        synced = set()
+        error = None
+        try:
+            # The client and server repos are independent, so sync them concurrently
+            with ThreadPoolExecutor(max_workers=len(updates)) as executor:
+                futures = {executor.submit(update): name for name, update in updates.items()}
+                for future in as_completed(futures):
+                    try:
+                        future.result()
+                        synced.add(futures[future])
+                    except Exception as e:
+                        logging.error("Failed to sync %s: %s", futures[future], e)
+                        error = error or e
+        finally:
+            self._save_index()
+        # Only a completed sync may be skipped next time, a failed repo is
+        # synced again on the next run
+        for name in synced:
+            if heads[name] is not None:
+                state[name] = {"sha": heads[name], "at": time.time()}
+        self._save_sync_state(state)
+        if error is not None:
+            raise error
         # self.update_resourcepacks()
         # self.update_shaderpacks()
 
-    def update_config(self):
-        # get all the files and folders in the instance.defaultconfigs_dir and copy the to instance.configs_dir
-        defaultconfigs = github_utils.fetch_all(
+    def install_client_files(self):
+        # Extract defaultconfigs, modflared, mods and servers.dat from a single
+        # client repo tarball
+        github_utils.extract_repo_archive(
             self.client_repo["url"],
-            "defaultconfigs",
-            self.client_repo["branch"],
+            self._ref(self.client_repo),
+            self.client_targets,
+            exclude=(CONNECTOR_PREFIX,),
         )
-        for file in defaultconfigs:
-            dest = Path(self.instance.config_dir) / Path(file).relative_to(
-                "defaultconfigs"
-            )
-            dest.parent.mkdir(parents=True, exist_ok=True)
-            github_utils.download_repo_file(
-                self.client_repo["url"], file, self.client_repo["branch"], dest=dest
-            )
+
+    def update_client_files(self):
+        # Work out what changed in every client folder and servers.dat first, so
+        # a large update can be fetched as a single archive
+        with ThreadPoolExecutor(max_workers=len(self.client_targets)) as executor:
+            futures = [
+                executor.submit(self._mods_changes)
+                if path == "mods"
+                else executor.submit(self._folder_changes, self.client_repo, path, target)
+                for path, target in self.client_targets.items()
+            ]
+            changes = {}
+            for future in futures:
+                changes.update(future.result())
+        self._fetch_changes(self.client_repo, changes)
 
     def update_kubejs(self):
         # Fetch all files from the kubejs folder in the server repo and replace local kubejs folder
-        kubejs_files = github_utils.fetch_all(
-            self.server_repo["url"],
-            "kubejs",
-            self.server_repo["branch"],
+        self._fetch_changes(
+            self.server_repo,
+            self._folder_changes(self.server_repo, "kubejs", self.instance.kubejs_dir),
         )
-        for file in kubejs_files:
-            dest = Path(self.instance.kubejs_dir) / Path(file).relative_to("kubejs")
-            dest.parent.mkdir(parents=True, exist_ok=True)
-            github_utils.download_repo_file(
-                self.server_repo["url"], file, self.server_repo["branch"], dest=dest
-            )
 
-    def update_modflared(self):
-        modflared_files = github_utils.fetch_all(
-            self.client_repo["url"],
-            "modflared",
-            self.client_repo["branch"],
-        )
-        for file in modflared_files:
-            dest = Path(self.instance.modflared_dir) / Path(file).relative_to(
-                "modflared"
-            )
-            dest.parent.mkdir(parents=True, exist_ok=True)
-            github_utils.download_repo_file(
-                self.client_repo["url"], file, self.client_repo["branch"], dest=dest
-            )
-
-    def update_mods(self):
+    def _mods_changes(self):
         """
         Make the instance mods folder exactly match the client repo's mods folder, ignoring the .connector folder:
         - Remove any local file not in the repo (except .connector and its contents)
-        - Download/update every file from the repo (preserving subfolders, except .connector)
+        - Return every repo file that is missing or differs locally (preserving subfolders, except .connector)
         """
-        import os
-        repo_mods = github_utils.fetch_all(
-            self.client_repo["url"],
-            "mods",
-            self.client_repo["branch"],
-        )
+        repo_mods = self._get_repo_files(self.client_repo, "mods")
         # Filter out any files in the .connector folder
-        repo_mods = [f for f in repo_mods if not f.startswith("mods/.connector/") and f != "mods/.connector"]
-        repo_mods_set = set(repo_mods)
-
-        # Get all local files (recursively, relative to mods_dir)
-        local_mods = []
-        for root, _, files in os.walk(self.instance.mods_dir):
-            for f in files:
-                rel_path = os.path.relpath(os.path.join(root, f), self.instance.mods_dir)
-                rel_path = rel_path.replace("\\", "/")  # Normalize for Windows
-                # Ignore files in .connector folder
-                if rel_path.startswith(".connector/") or rel_path == ".connector":
-                    continue
-                local_mods.append(f"mods/{rel_path}")
-        local_mods_set = set(local_mods)
+        repo_mods = {
+            f: sha
+            for f, sha in repo_mods.items()
+            if not f.startswith(CONNECTOR_PREFIX)
+        }
+
+        # Get all local files (recursively, relative to mods_dir) with their stats
+        local_mods = {
+            f"mods/{rel_path}": stat
+            for rel_path, stat in self._scan(self.instance.mods_dir, skip=(CONNECTOR_DIR,)).items()
+        }
 
         # Remove local files not in the repo
-        for mod in local_mods_set - repo_mods_set:
+        for mod in local_mods.keys() - repo_mods.keys():
             try:
                 abs_path = os.path.join(self.instance.mods_dir, mod[len("mods/"):])
                 os.remove(abs_path)
-                logging.info(f"Removed mod: {mod}")
+                logging.info("Removed mod: %s", mod)
             except Exception as e:
                 logging.error(f"Failed to remove mod {mod}: {e}")
 
-        # Only download files that are missing locally (by name)
-
-        local_mod_names = {os.path.basename(mod) for mod in local_mods}
-
-        for repo_mod in repo_mods:
-            mod_name = os.path.basename(repo_mod)
-            if mod_name not in local_mod_names:
-                dest = Path(self.instance.mods_dir) / Path(repo_mod).relative_to("mods")
-                dest.parent.mkdir(parents=True, exist_ok=True)
-                github_utils.download_repo_file(
-                    self.client_repo["url"], repo_mod, self.client_repo["branch"], dest=dest
-                )
-                logging.info(f"Downloaded/updated mod: {repo_mod}")
+        # Only download files that are missing or whose content differs from the repo
+        return self._folder_changes(
+            self.client_repo,
+            "mods",
+            self.instance.mods_dir,
+            files=repo_mods,
+            local_stats=local_mods,
+        )
 
     def update_resourcepacks(self, zip_file):
         # look for files in resourcepacks folder that match the name in required_folder, and replace them, if the dont exist, add them
@@ -142,6 +182,167 @@ class InstanceService:
         shaderpacks_folder = self.instance.shaders_dir
         self.file_service.add_files_to_folder(zip_file, shaderpacks_folder)
 
+    def _folder_changes(self, repo, folder, target_dir, files=None, local_stats=None):
+        # Repo files under `folder` whose local copy in target_dir is missing or
+        # differs, as {repo path: (destination, sha)}. `folder` may also be a
+        # single file, with target_dir as its destination. `local_stats` maps repo
+        # paths to stats from an earlier scan, so those files aren't stat'ed again
+        if files is None:
+            files = self._get_repo_files(repo, folder)
+        changes = {}
+        for file, sha in files.items():
+            dest = Path(target_dir) / Path(file).relative_to(folder)
+            if local_stats is None:
+                up_to_date = self._is_up_to_date(dest, sha)
+            else:
+                stat = local_stats.get(file)
+                up_to_date = stat is not None and self._is_up_to_date(dest, sha, stat)
+            if not up_to_date:
+                changes[file] = (dest, sha)
+        return changes
+
+    def _fetch_changes(self, repo, changes):
+        downloads = {file: dest for file, (dest, _) in changes.items()}
+        if len(downloads) > ARCHIVE_THRESHOLD:
+            logging.info(
+                "%d files changed in %s, downloading the repo archive",
+                len(downloads),
+                repo["name"],
+            )
+            github_utils.extract_repo_archive(repo["url"], self._ref(repo), downloads)
+        else:
+            github_utils.download_repo_files(
+                repo["url"], downloads, self._ref(repo), on_done=self._on_file_downloaded
+            )
+        # Index what was actually written, so a stale copy is fetched again
+        # next time instead of being recorded as up to date
+        for file, (dest, sha) in changes.items():
+            local_sha = file_utils.git_blob_sha(dest)
+            if local_sha != sha:
+                logging.warning("Downloaded %s doesn't match the repo tree", file)
+            self._remember(dest, local_sha)
+
+    def _get_repo_files(self, repo, folder):
+        # Files under `folder` (or the file itself) in the repo, with their git
+        # blob SHAs. A failed tree fetch raises: an empty listing would read as
+        # "the repo has no files" and delete the local copies
+        tree = github_utils.get_repo_tree(repo["url"], self._ref(repo))
+        return {
+            path: meta["sha"]
+            for path, meta in tree.items()
+            if path == folder or path.startswith(f"{folder}/")
+        }
+
+    def _is_up_to_date(self, path, sha, stat=None):
+        # Compare the local file with the repo blob, rehashing it only when
+        # its size or mtime changed since it was last indexed
+        if stat is None:
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                return False
+        key = self._index_key(path)
+        with self._index_lock:
+            entry = self._index.get(key)
+        if entry and entry["mtime"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            local_sha = entry["sha"]
+        else:
+            local_sha = file_utils.git_blob_sha(path)
+            self._remember(path, local_sha, stat)
+        return local_sha == sha
+
+    def _remember(self, path, sha, stat=None):
+        stat = stat or os.stat(path)
+        with self._index_lock:
+            self._index[self._index_key(path)] = {
+                "mtime": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "sha": sha,
+            }
+            self._index_changed = True
+
+    def _index_key(self, path):
+        return os.path.relpath(path, self.instance_dir).replace("\\", "/")
+
+    def _ref(self, repo):
+        # The commit this sync is pinned to, or the branch when its head is unknown
+        return self._heads.get(repo["name"]) or repo["branch"]
+
+    def _get_head_shas(self):
+        # Current head commit of each repo, None when it couldn't be fetched
+        def get_head_sha(repo):
+            try:
+                return github_utils.get_branch_head_sha(repo["url"], repo["branch"])
+            except Exception as e:
+                logging.warning("Could not get the head commit of %s: %s", repo["name"], e)
+                return None
+
+        repos = (self.client_repo, self.server_repo)
+        with ThreadPoolExecutor(max_workers=len(repos)) as executor:
+            shas = executor.map(get_head_sha, repos)
+        return {repo["name"]: sha for repo, sha in zip(repos, shas)}
+
+    def _load_sync_state(self):
+        try:
+            return json_utils.load(self.sync_state_file)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_sync_state(self, state):
+        try:
+            json_utils.dump(state, self.sync_state_file)
+        except OSError as e:
+            logging.error("Failed to save the instance sync state: %s", e)
+
+    def _load_index(self):
+        try:
+            self._index = json_utils.load(self.index_file)
+        except (OSError, ValueError):
+            self._index = {}
+        self._index_changed = False
+
+    def _save_index(self):
+        if not self._index_changed:
+            return
+        try:
+            json_utils.dump(self._index, self.index_file)
+        except OSError as e:
+            logging.error("Failed to save the instance file index: %s", e)
+
+    def _on_file_downloaded(self, file):
+        if file.startswith("mods/"):
+            logging.info("Downloaded/updated mod: %s", file)
+        if self.progress_callback:
+            self.progress_callback(50, "Syncing instance files", file)
+
+    def _scan(self, folder, skip=()):
+        # Every file under folder as {relative path: stat}. scandir hands back
+        # the stat from the directory listing where the OS provides it, and
+        # folders named in `skip` are not entered
+        files = {}
+        stack = [(folder, "")]
+        while stack:
+            path, prefix = stack.pop()
+            try:
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        rel_path = prefix + entry.name
+                        if entry.is_dir(follow_symlinks=False):
+                            if rel_path not in skip:
+                                stack.append((entry.path, rel_path + "/"))
+                        elif entry.is_file(follow_symlinks=False):
+                            files[rel_path] = entry.stat(follow_symlinks=False)
+            except FileNotFoundError:
+                continue
+        return files
+
+    def _is_fresh_install(self):
+        try:
+            with os.scandir(self.instance.mods_dir) as entries:
+                return next(entries, None) is None
+        except FileNotFoundError:
+            return True
+
     def _create_instance_folder(self):
         try:
             if not os.path.exists(self.instance.instance_dir):
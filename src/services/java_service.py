@@ -8,6 +8,7 @@ class JavaService:
     def __init__(self):
         logging.debug("Initializing JavaService")
         self.required_version = "17"
+        self._required_major = int(self.required_version)
 
     def update(self):
         try:
@@ -22,18 +23,17 @@ class JavaService:
 
     def _is_update_required(self):
         try:
-            required_version = self.required_version
             current_version = self._get_java_current_version()
             logging.info(
                 "Checking for updates for java: current %s vs required %s",
                 current_version,
-                required_version,
+                self.required_version,
             )
-            if not current_version or not required_version:
-                logging.error("Current or required Java version is not set.")
+            if not current_version:
+                logging.error("Current Java version is not set.")
                 yield True
             else:
-                yield int(current_version) < int(required_version)
+                yield int(current_version) < self._required_major
         except Exception as e:
             logging.error("Error checking Java update: %s", e)
             yield False
@@ -1,37 +1,46 @@
 import logging
 import subprocess
 import os
-import json
 import uuid
 import sys
-import requests
+import zipfile
 from pathlib import Path
 from tqdm import tqdm
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from ..utils.file_utils import download_file
+from ..utils.file_utils import download_file, extract_archives
 
-from csv import __version__
-from ..utils import github_utils
+from ..utils import github_utils, json_utils, version_utils
+from ..models.constants import CLIENT_REPO, DOWNLOADS_DIR, INSTANCE_DIR
 from ..models.loader import Loader
 from ..models.game import Game
+from ..version import __version__
+
+# Libraries injected into the NeoForge version JSON at launch, resolved once
+BOOTSTRAPLAUNCHER_VERSION = "2.0.2"
+SECUREJARHANDLER_VERSION = "3.0.8"
+FORGE_MAVEN = "https://maven.minecraftforge.net/"
+BL_PATH = f"cpw/mods/bootstraplauncher/{BOOTSTRAPLAUNCHER_VERSION}/bootstraplauncher-{BOOTSTRAPLAUNCHER_VERSION}.jar"
+BL_URL = FORGE_MAVEN + BL_PATH
+SJH_PATH = f"cpw/mods/securejarhandler/{SECUREJARHANDLER_VERSION}/securejarhandler-{SECUREJARHANDLER_VERSION}.jar"
+SJH_URL = FORGE_MAVEN + SJH_PATH
+# Name prefixes of the libraries above, replaced in the version JSON in one check
+INJECTED_LIBRARIES = ("cpw.mods.bootstraplauncher:", "cpw.mods.securejarhandler:")
 
 
 class LauncherService:
     def __init__(self, root_dir: str, game: Game, loader: Loader):
         try:
             self.root_dir = Path(root_dir)
-            self.instance_dir = Path(self.root_dir, "instance")
-            self.downloads_dir = Path(self.root_dir, "downloads")
+            self.instance_dir = Path(self.root_dir, INSTANCE_DIR)
+            self.downloads_dir = Path(self.root_dir, DOWNLOADS_DIR)
+            self.release_cache_file = Path(self.downloads_dir, ".release_cache.json")
             self.loader = loader
             self.game = game
             self.minecraft_version = game.version
             self.manifest_url = game.manifest_url
+            self.release = None
 
-            self.launcher_repo = {
-                "name": "facufierro/FFTClientMinecraft1211",
-                "url": "https://github.com/facufierro/FFTClientMinecraft1211",
-                "branch": "main",
-            }
+            self.launcher_repo = CLIENT_REPO
 
         except Exception as e:
             logging.critical("Error initializing LauncherService: %s", e)
@@ -39,38 +48,60 @@ class LauncherService:
 
     def update(self):
         try:
-            self._fetch_updater_file()
-            with open("Updater.exe", "wb") as f:
-                f.write(self.updater_file)
-            logging.info("Updater replaced successfully.")
+            self.replace_updater()
             if self._is_update_required():
                 logging.info("Update is required.")
                 self._fetch_launcher_file()
-                subprocess.Popen(["Updater.exe", self.root_dir], cwd=".")
+                subprocess.Popen(
+                    [str(self.root_dir / "Updater.exe"), self.root_dir],
+                    cwd=self.root_dir,
+                )
                 sys.exit(0)
             else:
                 logging.info("No update required, continuing with launcher.")
+        except Exception as e:
+            logging.error(f"Failed to update launcher: {e}")
+
+    def replace_updater(self):
+        try:
+            replaced = github_utils.download_release_file(
+                "Updater.exe",
+                self.launcher_repo.get("name"),
+                self.root_dir / "Updater.exe",
+                self._get_release(),
+            )
+            if replaced:
+                logging.info("Updater replaced successfully.")
+            elif replaced is False:
+                logging.info("Updater is already up to date.")
+            else:
+                logging.warning("Updater.exe not available, keeping the current one.")
         except Exception as e:
             logging.error(f"Failed to replace updater: {e}")
 
     def launch_game(self):
         versions_dir = self.instance_dir / "versions"
-        version_folder = None
-        for d in versions_dir.iterdir():
-            if d.is_dir() and d.name.startswith("neoforge-"):
-                version_folder = d
-                break
+        # The loader knows its own version folder; only search versions/ when
+        # it isn't there, reading the type from the directory listing
+        version_folder = Path(self.loader.launcher_dir)
+        if not version_folder.is_dir():
+            version_folder = None
+            with os.scandir(versions_dir) as entries:
+                for entry in entries:
+                    if entry.is_dir() and entry.name.startswith("neoforge-"):
+                        version_folder = Path(entry.path)
+                        break
         if not version_folder:
             print("Could not find NeoForge version folder after install.")
             sys.exit(1)
         version_json = version_folder / f"{version_folder.name}.json"
-        with open(version_json) as f:
-            vjson = json.load(f)
+        vjson = json_utils.load(version_json)
 
         # --- Extract all native jars to natives directory ---
         libs_dir = self.instance_dir / "libraries"
         natives_dir = self.instance_dir / "natives"
         natives_dir.mkdir(parents=True, exist_ok=True)
+        native_jars = []
         for lib in vjson["libraries"]:
             if "downloads" in lib and "artifact" in lib["downloads"]:
                 path = libs_dir / Path(lib["downloads"]["artifact"]["path"])
@@ -79,11 +110,11 @@ class LauncherService:
                     and "-natives-" in path.name
                     and path.exists()
                 ):
-                    try:
-                        with zipfile.ZipFile(path, "r") as zf:
-                            zf.extractall(natives_dir)
-                    except Exception as e:
-                        print(f"[WARN] Failed to extract natives from {path}: {e}")
+                    native_jars.append(path)
+        try:
+            extract_archives(native_jars, natives_dir)
+        except Exception as e:
+            print(f"[WARN] Failed to extract natives: {e}")
 
         # --- Build classpath and module-path strictly from version JSON, inject bootstraplauncher/securejarhandler ---
         cp_jars = []
@@ -95,30 +126,18 @@ class LauncherService:
         vjson["libraries"] = [
             lib
             for lib in vjson["libraries"]
-            if not (
-                lib["name"].startswith("cpw.mods.bootstraplauncher:")
-                or lib["name"].startswith("cpw.mods.securejarhandler:")
-            )
+            if not lib["name"].startswith(INJECTED_LIBRARIES)
         ]
-        BOOTSTRAPLAUNCHER_VERSION = "2.0.2"
-        SECUREJARHANDLER_VERSION = "3.0.8"
-        FORGE_MAVEN = "https://maven.minecraftforge.net/"
-        bl_path = f"cpw/mods/bootstraplauncher/{BOOTSTRAPLAUNCHER_VERSION}/bootstraplauncher-{BOOTSTRAPLAUNCHER_VERSION}.jar"
-        sjh_path = f"cpw/mods/securejarhandler/{SECUREJARHANDLER_VERSION}/securejarhandler-{SECUREJARHANDLER_VERSION}.jar"
         vjson["libraries"].append(
             {
                 "name": f"cpw.mods.bootstraplauncher:bootstraplauncher:{BOOTSTRAPLAUNCHER_VERSION}",
-                "downloads": {
-                    "artifact": {"path": bl_path, "url": FORGE_MAVEN + bl_path}
-                },
+                "downloads": {"artifact": {"path": BL_PATH, "url": BL_URL}},
             }
         )
         vjson["libraries"].append(
             {
                 "name": f"cpw.mods.securejarhandler:securejarhandler:{SECUREJARHANDLER_VERSION}",
-                "downloads": {
-                    "artifact": {"path": sjh_path, "url": FORGE_MAVEN + sjh_path}
-                },
+                "downloads": {"artifact": {"path": SJH_PATH, "url": SJH_URL}},
             }
         )
         for lib in vjson["libraries"]:
@@ -137,8 +156,8 @@ class LauncherService:
                 if name.startswith("org.lwjgl:"):
                     lwjgl_jars.append(str(path))
         for url, path in [
-            (FORGE_MAVEN + bl_path, libs_dir / bl_path),
-            (FORGE_MAVEN + sjh_path, libs_dir / sjh_path),
+            (BL_URL, libs_dir / BL_PATH),
+            (SJH_URL, libs_dir / SJH_PATH),
         ]:
             if not path.exists():
                 print(f"[INFO] Downloading injected {path.name}...")
@@ -169,19 +188,22 @@ class LauncherService:
             path = libs_dir / Path(lib["downloads"]["artifact"]["path"])
             vanilla_jars.append(str(path))
             if not path.exists():
-                missing_vanilla_libs.append((lib["downloads"]["artifact"]["url"], path))
+                missing_vanilla_libs.append((lib["downloads"]["artifact"], path))
         if missing_vanilla_libs:
             print(
                 f"[INFO] Downloading {len(missing_vanilla_libs)} missing vanilla libraries..."
             )
-            for url, path in missing_vanilla_libs:
-                print(f"[INFO] Downloading {url} -> {path}")
-                download_file(url, path)
+            for artifact, path in missing_vanilla_libs:
+                print(f"[INFO] Downloading {artifact['url']} -> {path}")
+                download_file(
+                    artifact["url"],
+                    path,
+                    sha1=artifact.get("sha1"),
+                    size=artifact.get("size"),
+                )
         for jar in vanilla_jars:
             if jar not in cp_jars:
                 cp_jars.append(jar)
-        import zipfile
-
         all_lwjgl_jars = [j for j in cp_jars if r"org\lwjgl" in j or "org/lwjgl" in j]
         struct_found = False
         for jar in all_lwjgl_jars:
@@ -207,7 +229,7 @@ class LauncherService:
         classpath = ";".join(cp_jars)
         module_path = ";".join(mp_jars)
         print(f"[DEBUG] Module path: {module_path}")
-        print(f"[DEBUG] Full classpath:")
+        print("[DEBUG] Full classpath:")
         for j in cp_jars:
             print("  ", j)
 
@@ -229,7 +251,7 @@ class LauncherService:
             f"-Djna.tmpdir={natives_dir_str}",
             f"-Dorg.lwjgl.system.SharedLibraryExtractPath={natives_dir_str}",
             f"-Dio.netty.native.workdir={natives_dir_str}",
-            f"-DlibraryDirectory={str(libs_dir)}",
+            f"-DlibraryDirectory={libs_dir}",
             "-Dminecraft.launcher.brand=ATLauncher",
             "-Dminecraft.launcher.version=3.4.40.1",
             "-cp",
@@ -283,19 +305,10 @@ class LauncherService:
         print(f"Launching NeoForge with UUID: {random_uuid}")
         subprocess.run(args, cwd=self.instance_dir)
 
-    def _fetch_updater_file(self):
-        try:
-            self.updater_file = github_utils.get_release_file(
-                "Updater.exe", self.launcher_repo.get("name")
-            )
-        except Exception as e:
-            logging.error(f"Failed to fetch Updater.exe: {e}")
-            raise e
-
     def _fetch_launcher_file(self):
         try:
             self.launcher_file = github_utils.get_release_file(
-                "FFTLauncher.exe", self.launcher_repo.get("name")
+                "FFTLauncher.exe", self.launcher_repo.get("name"), self._get_release()
             )
             downloads_dir = self.downloads_dir
             os.makedirs(downloads_dir, exist_ok=True)
@@ -306,19 +319,30 @@ class LauncherService:
             logging.error(f"Failed to fetch FFTLauncher.exe: {e}")
             raise e
 
+    def _get_release(self):
+        # Fetch the release once and reuse it for the updater, the version
+        # check and the launcher download
+        if self.release is None:
+            self.release = github_utils.get_latest_release(
+                self.launcher_repo.get("name"), self.release_cache_file
+            )
+        return self.release
+
     def _is_update_required(self):
         requiered_version = github_utils.get_release_version(
-            self.launcher_repo.get("url")
+            self.launcher_repo.get("url"), self._get_release()
         )
         current_version = __version__
         logging.info(
-            f"Current launcher version: {current_version}, Latest release: {requiered_version}"
+            "Current launcher version: %s, Latest release: %s",
+            current_version,
+            requiered_version,
         )
-        return requiered_version and current_version != requiered_version
+        # Compared as numbers, so 2.0.10 is newer than 2.0.9 and an older
+        # release never downgrades the launcher
+        return bool(requiered_version) and version_utils.parse_version(
+            current_version
+        ) < version_utils.parse_version(requiered_version)
 
     def get_version_json(self, version):
-        manifest = requests.get(self.game.manifest_url).json()
-        for v in manifest["versions"]:
-            if v["id"] == version:
-                return requests.get(v["url"]).json()
-        raise Exception(f"Version {version} not found")
+        return version_utils.get_version_json(version, self.instance_dir / "cache")
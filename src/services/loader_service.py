@@ -3,15 +3,17 @@ import os
 import re
 import subprocess
 import requests
+from ..models.constants import DOWNLOADS_DIR, INSTANCE_DIR
 from ..models.loader import Loader
+from ..utils.file_utils import atomic_write
 
 
 class LoaderService:
     def __init__(self, root_dir: str):
         logging.debug("Initializing LoaderService")
         self.root_dir = root_dir
-        self.downloads_dir = os.path.join(root_dir, "downloads")
-        self.instance_dir = os.path.join(root_dir, "instance")
+        self.downloads_dir = os.path.join(root_dir, DOWNLOADS_DIR)
+        self.instance_dir = os.path.join(root_dir, INSTANCE_DIR)
         self.loader = Loader(
             self.instance_dir,
             self.downloads_dir,
@@ -44,9 +46,10 @@ class LoaderService:
         if not os.path.exists(installer_path):
             logging.debug("Loader installer JAR not found, download needed")
             return True
-        # If versions do not match, download is needed
-        logging.debug("Loader installer JAR version mismatch, download needed")
-        return True
+        # The installer name carries the required version, so an existing
+        # file is already the right one
+        logging.debug("Loader installer JAR already downloaded")
+        return False
 
     def _download(self):
         try:
@@ -55,11 +58,11 @@ class LoaderService:
             target_path = os.path.join(self.loader.downloads_dir, self.loader.installer)
             response = requests.get(self.loader.download_url, stream=True)
             response.raise_for_status()
-            with open(target_path, "wb") as f:
+            with atomic_write(target_path) as f:
                 for chunk in response.iter_content(chunk_size=8192):
                     if chunk:
                         f.write(chunk)
-            logging.debug(f"Loader downloaded to {target_path}")
+            logging.debug("Loader downloaded to %s", target_path)
         except requests.RequestException as e:
             logging.error(f"Failed to download Loader: {e}")
             raise
@@ -1,32 +1,35 @@
 import logging
-import json
 import os
+from dataclasses import asdict
+from ..models.constants import INSTANCE_DIR
 from ..models.profile import Profile
+from ..utils import json_utils
+from ..version import __loader_version__
+
+# Path -> ((mtime_ns, size), parsed launcher_profiles.json)
+_profiles_cache = {}
 
 
 class ProfileService:
     def __init__(self, root_dir: str):
 
         logging.debug("Initializing ProfileService")
-        self.instance_dir = os.path.join(root_dir, "instance")
+        self.instance_dir = os.path.join(root_dir, INSTANCE_DIR)
         self.profile = Profile(
             id="a4e7d1b6b0974c87bd556f8db97afda3",
             created="2023-10-01T12:00:00Z",
             icon="Furnace",
             lastUsed="2025-07-11T16:45:20.8297Z",
-            lastVersionId="neoforge-21.1.192",
+            # Follows the loader so the profile points at the installed version
+            lastVersionId=f"neoforge-{__loader_version__}",
             name="FFTClient",
             type="custom",
+            gameDir=self.instance_dir,
         )
         self.profile_file = os.path.join(self.instance_dir, "launcher_profiles.json")
 
     def _is_update_required(self):
-        if os.path.exists(self.profile_file):
-            with open(self.profile_file, "r", encoding="utf-8") as file:
-                data = json.load(file)
-        else:
-            data = {}
-        profiles = data.get("profiles", {})
+        profiles = self._read_profiles().get("profiles", {})
         for profile_info in profiles.values():
             if profile_info.get("name") == self.profile.name:
                 return False
@@ -37,23 +40,33 @@ class ProfileService:
         try:
             if not self._is_update_required():
                 logging.info(
-                    f"Profile '{self.profile.name}' already exists, skipping..."
+                    "Profile '%s' already exists, skipping...", self.profile.name
                 )
                 return
-            # Read the existing launcher_profiles.json
-            if os.path.exists(self.profile_file):
-                with open(self.profile_file, "r", encoding="utf-8") as file:
-                    data = json.load(file)
-            else:
-                data = {}
-            profiles = data.get("profiles", {})
+            # Copy the cached launcher_profiles.json so the cache isn't changed
+            # if the write fails
+            data = dict(self._read_profiles())
+            profiles = dict(data.get("profiles", {}))
             # Add the profile
-            profiles[self.profile.id] = self.profile.__dict__
+            profiles[self.profile.id] = asdict(self.profile)
             data["profiles"] = profiles
             # Write back the updated data
-            with open(self.profile_file, "w", encoding="utf-8") as file:
-                json.dump(data, file, indent=4)
+            json_utils.dump(data, self.profile_file, indent=True)
             logging.info("Profile data updated successfully")
         except Exception as e:
             logging.error("Failed to update profile data: %s", e)
             raise
+
+    def _read_profiles(self):
+        # Parse launcher_profiles.json only when it changed since the last read
+        try:
+            stat = os.stat(self.profile_file)
+        except FileNotFoundError:
+            return {}
+        key = (stat.st_mtime_ns, stat.st_size)
+        cached = _profiles_cache.get(self.profile_file)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        data = json_utils.load(self.profile_file)
+        _profiles_cache[self.profile_file] = (key, data)
+        return data
@@ -1,16 +1,30 @@
 import logging
+from functools import cached_property
 from ..ui.components.main_window import MainWindow
-from ..ui.components.settings_window import SettingsWindow
-from ..ui.components.update_dialog import UpdateDialog
+
+# Progress values that are logged; everything in between only updates the bar
+_MILESTONES = frozenset({0, 25, 50, 75, 90, 100})
 
 
 class UIService:
     def __init__(self):
+        # Only the main window is built up front, the others are created the
+        # first time they are shown
         self.main_window = MainWindow()
-        self.settings_window = SettingsWindow()
-        self.update_dialog = UpdateDialog()
         logging.debug("UIService initialized")
 
+    @cached_property
+    def settings_window(self):
+        from ..ui.components.settings_window import SettingsWindow
+
+        return SettingsWindow()
+
+    @cached_property
+    def update_dialog(self):
+        from ..ui.components.update_dialog import UpdateDialog
+
+        return UpdateDialog()
+
     def show_main(self):
         self.main_window.show()
         return self.main_window
@@ -45,12 +59,16 @@ class UIService:
             logging.warning("Update dialog is not visible, cannot close")
 
     def get_progress_callback(self):
+        # Resolve the progress bar once instead of on every update
+        progress_bar = getattr(self.main_window, "progress_bar", None)
+        if progress_bar is None:
+            logging.warning("No progress bar found in main window")
+
         def progress_callback(progress, status, details=None):
-            logging.debug(f"Progress update: {progress}% - {status} - {details}")
-            if hasattr(self.main_window, "progress_bar"):
-                self.main_window.progress_bar.set_progress(progress, status, details)
-                logging.debug(f"Progress bar updated: {progress}%")
-            else:
-                logging.warning("No progress bar found in main window")
+            if progress in _MILESTONES:
+                logging.debug("Progress update: %s%% - %s - %s", progress, status, details)
+            # The progress bar coalesces bursts into one UI update per interval
+            if progress_bar is not None:
+                progress_bar.set_progress(progress, status, details)
 
         return progress_callback
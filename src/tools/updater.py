@@ -18,15 +18,11 @@ def get_base_directory():
         return os.path.dirname(os.path.abspath(__file__))
 
 
-
+# Resolved once; the logs and the update both live under this folder
+BASE_DIR = get_base_directory()
 
 # Always log to the logs directory in the root app folder (passed as first argument)
-if len(sys.argv) > 1:
-    root_dir = sys.argv[1]
-else:
-    # Fallback: use the directory of the executable or script
-    root_dir = os.path.dirname(sys.executable) if getattr(sys, "frozen", False) else os.path.dirname(os.path.abspath(__file__))
-logs_dir = os.path.join(root_dir, "logs")
+logs_dir = os.path.join(BASE_DIR, "logs")
 os.makedirs(logs_dir, exist_ok=True)
 log_file = os.path.join(logs_dir, "updater.log")
 logging.basicConfig(
@@ -75,22 +71,22 @@ def replace_file():
     progress = UpdateProgress()
     logging.info("[Updater] Starting update process.")
 
-    base_dir = get_base_directory()
-    logging.debug(f"[Updater] Base directory: {base_dir}")
+    base_dir = BASE_DIR
+    logging.debug("[Updater] Base directory: %s", base_dir)
     exe_file = os.path.join(base_dir, "FFTLauncher.exe")
     downloads_dir = os.path.join(base_dir, "downloads")
     update_file = os.path.join(downloads_dir, "FFTLauncher.exe")
 
-    logging.debug(f"[Updater] exe_file: {exe_file}")
-    logging.debug(f"[Updater] downloads_dir: {downloads_dir}")
-    logging.debug(f"[Updater] update_file (from downloads): {update_file}")
+    logging.debug("[Updater] exe_file: %s", exe_file)
+    logging.debug("[Updater] downloads_dir: %s", downloads_dir)
+    logging.debug("[Updater] update_file (from downloads): %s", update_file)
 
     # Wait for the update file to appear (up to 30 seconds)
     progress.update_progress(10, "Waiting for update file in downloads...")
     try:
         found = False
         for i in range(30):
-            logging.debug(f"[Updater] Checking for update file, attempt {i+1}/30...")
+            logging.debug("[Updater] Checking for update file, attempt %d/30...", i + 1)
             if os.path.exists(update_file):
                 found = True
                 logging.info("[Updater] Update file found in downloads.")
@@ -115,19 +111,19 @@ def replace_file():
         progress.update_progress(80, "Removing old launcher...")
         if os.path.exists(exe_file):
             try:
-                logging.debug(f"[Updater] Attempting to remove old launcher: {exe_file}")
+                logging.debug("[Updater] Attempting to remove old launcher: %s", exe_file)
                 os.remove(exe_file)
                 logging.info("[Updater] Old launcher removed.")
             except Exception as e:
                 logging.error(f"[Updater] Failed to remove old launcher: {e}")
                 raise
         else:
-            logging.debug(f"[Updater] Old launcher not found at: {exe_file}")
+            logging.debug("[Updater] Old launcher not found at: %s", exe_file)
 
         # Move update file from downloads to root as exe
         progress.update_progress(90, "Installing update...")
         try:
-            logging.debug(f"[Updater] Moving update file from {update_file} to {exe_file}")
+            logging.debug("[Updater] Moving update file from %s to %s", update_file, exe_file)
             os.rename(update_file, exe_file)
             logging.info("[Updater] Update file moved from downloads to launcher executable.")
             # Delete the update file from downloads if it still exists (shouldn't, but for safety)
@@ -141,7 +137,7 @@ def replace_file():
         # Launch the new executable
         progress.update_progress(95, "Launching updated launcher...")
         try:
-            logging.debug(f"[Updater] Launching new executable: {exe_file}")
+            logging.debug("[Updater] Launching new executable: %s", exe_file)
             subprocess.Popen([exe_file], creationflags=subprocess.CREATE_NO_WINDOW)
             logging.info("[Updater] Launched updated launcher.")
         except Exception as e:
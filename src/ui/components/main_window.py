@@ -22,6 +22,10 @@ from src.ui.components.progress_bar import ProgressBarWidget
 
 class MainWindow(QMainWindow):
     launch_requested = Signal()  # Custom signal for launch requests
+    launch_button_enabled_changed = Signal(bool)
+    launch_button_text_changed = Signal(str)
+    launch_button_reset = Signal()
+    close_requested = Signal()
 
     def __init__(self):
         super().__init__()
@@ -148,13 +152,31 @@ class MainWindow(QMainWindow):
         main_layout.addWidget(self.console_card)
         # Removed stray __init__ method and associated code
 
+        # Signals let background threads update the window safely
+        self.launch_button_enabled_changed.connect(self.launch_button.setEnabled)
+        self.launch_button_text_changed.connect(self.launch_button.setText)
+        self.launch_button_reset.connect(self._reset_launch_button)
+        self.close_requested.connect(self.close)
+
     def set_launch_button_enabled(self, enabled: bool):
-        """Enable or disable the launch button."""
-        self.launch_button.setEnabled(enabled)
+        """Enable or disable the launch button (thread-safe)."""
+        self.launch_button_enabled_changed.emit(enabled)
 
     def set_launch_button_text(self, text: str):
-        """Set the text of the launch button."""
-        self.launch_button.setText(text)
+        """Set the text of the launch button (thread-safe)."""
+        self.launch_button_text_changed.emit(text)
+
+    def reset_launch_button(self):
+        """Re-enable the launch button with its default text (thread-safe)."""
+        self.launch_button_reset.emit()
+
+    def _reset_launch_button(self):
+        self.launch_button.setEnabled(True)
+        self.launch_button.setText("Launch")
+
+    def request_close(self):
+        """Close the window from any thread."""
+        self.close_requested.emit()
 
     def on_launch_button_clicked(self, callback):
         """Set the callback to be called when the launch button is clicked."""
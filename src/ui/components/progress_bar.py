@@ -1,3 +1,4 @@
+import threading
 from PySide6.QtCore import QObject, Signal, QTimer, QPropertyAnimation, QEasingCurve
 from PySide6.QtWidgets import QProgressBar, QVBoxLayout, QWidget, QLabel, QHBoxLayout
 from PySide6.QtCore import Qt, QRect
@@ -55,12 +56,17 @@ class AnimatedProgressBar(QProgressBar):
 class ProgressBarWidget(QWidget):
     """Complete progress bar widget with label and status"""
     
-    # Signals for progress updates
-    progress_updated = Signal(int)  # progress value (0-100)
-    status_updated = Signal(str)    # status text
+    # A coalesced update is waiting to be applied
+    progress_pending = Signal()
+
+    # Coalesced updates are applied at most this often (20 Hz)
+    FLUSH_INTERVAL_MS = 50
     
     def __init__(self, parent=None):
         super().__init__(parent)
+        # Latest (value, status, details) not yet shown, None when nothing is scheduled
+        self._pending = None
+        self._pending_lock = threading.Lock()
         self.setup_ui()
         self.connect_signals()
         
@@ -108,8 +114,7 @@ class ProgressBarWidget(QWidget):
     
     def connect_signals(self):
         """Connect internal signals"""
-        self.progress_updated.connect(self._update_progress)
-        self.status_updated.connect(self._update_status)
+        self.progress_pending.connect(self._schedule_flush)
     
     def _update_progress(self, value):
         """Update progress bar value (thread-safe)"""
@@ -119,16 +124,37 @@ class ProgressBarWidget(QWidget):
         """Update status label (thread-safe)"""
         self.status_label.setText(text)
     
-    def set_progress(self, value, status=None, details=None):
-        """Set progress with optional status and details"""
-        self.progress_updated.emit(value)
-        
+    def _schedule_flush(self):
+        """Apply the pending update after the flush interval (UI thread)"""
+        QTimer.singleShot(self.FLUSH_INTERVAL_MS, self._flush_progress)
+    
+    def _flush_progress(self):
+        """Show the latest pending update"""
+        with self._pending_lock:
+            pending, self._pending = self._pending, None
+        if pending is None:
+            return
+        value, status, details = pending
+        self._update_progress(value)
         if status:
-            self.status_updated.emit(status)
-        
+            self._update_status(status)
         if details:
             self.details_label.setText(details)
     
+    def set_progress(self, value, status=None, details=None):
+        """Set progress with optional status and details (thread-safe)"""
+        # Updates are merged until the next flush, so a burst of calls costs a
+        # single queued event and repaint while the latest value always lands
+        with self._pending_lock:
+            scheduled = self._pending is not None
+            if scheduled:
+                _, last_status, last_details = self._pending
+                status = status or last_status
+                details = details or last_details
+            self._pending = (value, status, details)
+        if not scheduled:
+            self.progress_pending.emit()
+    
     def set_indeterminate(self, active=True):
         """Set progress bar to indeterminate mode"""
         if active:
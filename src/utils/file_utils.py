@@ -1,7 +1,208 @@
-def download_file(url, dest, show_progress=True, max_retries=3):
-    import requests
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+import threading
+from contextlib import contextmanager
+
+# Set on shutdown so running downloads stop at their next chunk
+_cancelled = threading.Event()
+
+# Upper bound on connections kept open per host, enough for the asset pool
+MAX_POOL_SIZE = 32
+# Downloads at least this large get their disk space reserved up front
+PREALLOCATE_MIN_SIZE = 1024 * 1024
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+_session = None
+_session_lock = threading.Lock()
+
+
+def _get_session():
+    # Built on first download so requests isn't imported at startup. Libraries
+    # and thousands of assets come from a couple of hosts, so one pooled
+    # session keeps those connections alive instead of a TLS handshake per file
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            session.mount(
+                "https://", HTTPAdapter(pool_connections=8, pool_maxsize=MAX_POOL_SIZE)
+            )
+            # Jars and assets are already compressed
+            session.headers["Accept-Encoding"] = "identity"
+            _session = session
+        return _session
+
+
+def download_file(url, dest, show_progress=True, max_retries=3, sha1=None, size=None):
+    """
+    Download url to dest. When the expected `sha1` (and `size`) are known, the
+    bytes are hashed while they stream in and a mismatch raises ValueError
+    without replacing dest, so no second pass over the file is needed.
+    """
     dest.parent.mkdir(parents=True, exist_ok=True)
-    r = requests.get(url, stream=True)
-    with open(dest, "wb") as f:
-        for chunk in r.iter_content(1024 * 32):
-            f.write(chunk)
+    raise_if_cancelled()
+    digest = hashlib.sha1() if sha1 else None
+    written = 0
+    with _get_session().get(url, stream=True, timeout=(5, 30)) as r:
+        # An error page must not be saved as the file
+        r.raise_for_status()
+        total = size if size is not None else int(r.headers.get("Content-Length") or 0)
+        with atomic_write(dest) as f:
+            preallocated = _preallocate(f, total)
+            for chunk in r.iter_content(DOWNLOAD_CHUNK_SIZE):
+                raise_if_cancelled()
+                f.write(chunk)
+                written += len(chunk)
+                if digest:
+                    digest.update(chunk)
+            if preallocated and written < total:
+                # Don't leave the reserved tail as zeros
+                f.truncate(written)
+            if size is not None and written != size:
+                raise ValueError(f"{url}: expected {size} bytes, got {written}")
+            if digest and digest.hexdigest() != sha1:
+                raise ValueError(f"{url}: SHA-1 mismatch")
+
+
+def _preallocate(f, total):
+    """Reserve total bytes for f in one allocation where the OS supports it"""
+    # Large files (client jar, big libraries) otherwise grow extent by extent
+    if total < PREALLOCATE_MIN_SIZE or not hasattr(os, "posix_fallocate"):
+        return False
+    try:
+        os.posix_fallocate(f.fileno(), 0, total)
+    except OSError:
+        return False
+    return True
+
+
+def download_bytes(url, sha1=None, size=None):
+    """
+    Download a small file into memory, for content that is parsed right away.
+    The expected `sha1` and `size` are checked as in download_file.
+    """
+    raise_if_cancelled()
+    r = _get_session().get(url, timeout=(5, 30))
+    r.raise_for_status()
+    content = r.content
+    if size is not None and len(content) != size:
+        raise ValueError(f"{url}: expected {size} bytes, got {len(content)}")
+    if sha1 and hashlib.sha1(content).hexdigest() != sha1:
+        raise ValueError(f"{url}: SHA-1 mismatch")
+    return content
+
+
+def cancel_downloads():
+    """Stop every running download at its next chunk and refuse new ones"""
+    _cancelled.set()
+
+
+def raise_if_cancelled():
+    if _cancelled.is_set():
+        raise RuntimeError("Download cancelled")
+
+
+@contextmanager
+def atomic_write(path, mode="wb", **kwargs):
+    """
+    Open a temporary "<name>.<random>.part" file next to path for writing and
+    move it over path once the block completes.
+    A crash or error mid-write leaves the previous file untouched instead of a torn one.
+    The temporary name is unique, so concurrent writers of one path don't share it.
+    """
+    directory, name = os.path.split(os.fspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=f"{name}.", suffix=".part", dir=directory or None)
+    try:
+        with os.fdopen(fd, mode, **kwargs) as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def sha256(path):
+    """Hex SHA-256 of a file, read in 1 MiB chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def git_blob_sha(path):
+    """Hash a file the way git hashes blobs, so it can be compared with tree SHAs"""
+    sha = hashlib.sha1(b"blob %d\0" % os.path.getsize(path))
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def zip_entry_path(target_dir, name):
+    """
+    Join a zip entry name onto target_dir, or return None if the entry is
+    absolute or climbs out with "..", the names ZipFile.extract would sanitise.
+    """
+    parts = name.replace("\\", "/").split("/")
+    if name.startswith(("/", "\\")) or os.path.splitdrive(name)[0] or ".." in parts:
+        return None
+    return os.path.join(target_dir, *(part for part in parts if part not in ("", ".")))
+
+
+def extract_archives(archives, target_dir, max_workers=8):
+    """
+    Extract several zip/jar archives into target_dir concurrently.
+    Entries are deduplicated by name with the last archive winning, the same
+    result as extracting them one after another.
+    zlib releases the GIL while inflating, so threads spread the work over cores.
+    Returns the number of extracted files.
+    """
+    entries = {}
+    for archive in archives:
+        try:
+            with zipfile.ZipFile(archive, "r") as zf:
+                for info in zf.infolist():
+                    if info.is_dir():
+                        continue
+                    dest = zip_entry_path(target_dir, info.filename)
+                    if dest is None:
+                        logging.warning("Skipping unsafe entry %s in %s", info.filename, archive)
+                        continue
+                    entries[info.filename] = (archive, info, dest)
+        except (OSError, zipfile.BadZipFile) as e:
+            logging.error("Failed to read %s: %s", archive, e)
+    # Each worker opens its archive once and extracts the entries it won
+    by_archive = {}
+    for archive, info, dest in entries.values():
+        by_archive.setdefault(archive, []).append((info, dest))
+    # Natives jars share folders, so each is created once here rather than
+    # by racing workers
+    for folder in {os.path.dirname(dest) for _, _, dest in entries.values()}:
+        os.makedirs(folder, exist_ok=True)
+
+    def extract(archive, members):
+        with zipfile.ZipFile(archive, "r") as zf:
+            for info, dest in members:
+                with zf.open(info) as source, open(dest, "wb") as target:
+                    shutil.copyfileobj(source, target, 1024 * 1024)
+
+    if not by_archive:
+        return 0
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(by_archive))) as executor:
+        futures = [
+            executor.submit(extract, archive, members) for archive, members in by_archive.items()
+        ]
+        for future in futures:
+            future.result()
+    return len(entries)
@@ -1,10 +1,25 @@
 
 import logging
 import requests
+from requests.adapters import HTTPAdapter
 import os
+import shutil
+import tarfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from . import file_utils, json_utils
+
+# Upper bound on files downloaded at once, to stay within GitHub's limits
+MAX_PARALLEL_DOWNLOADS = 8
 
 # Create a session with authentication if GITHUB_TOKEN or GH_TOKEN is set
 session = requests.Session()
+# The client and server repos sync at the same time, so keep enough connections
+# per host for both download pools to reuse instead of reconnecting
+_adapter = HTTPAdapter(pool_connections=8, pool_maxsize=MAX_PARALLEL_DOWNLOADS * 2)
+session.mount("https://", _adapter)
 session.headers.update({
     "User-Agent": "FFT-Minecraft-Launcher/2.0.0",
     "Accept-Encoding": "gzip, deflate, br",
@@ -20,77 +35,223 @@ else:
     logging.info("github_utils: No GitHub token found, using unauthenticated requests.")
 
 
-def get_release_file(file_name: str, repo: str):
-    try:
-        url = f"https://api.github.com/repos/{repo}/releases/latest"
-        response = session.get(url)
-        response.raise_for_status()
-        data = response.json()
-        for asset in data.get("assets", []):
-            if asset["name"] == file_name:
-                download_url = asset["browser_download_url"]
-                file_response = session.get(download_url)
-                file_response.raise_for_status()
-                return file_response.content
-        logging.warning(f"File '{file_name}' not found in the latest release.")
-        return None
-    except requests.RequestException as e:
-        logging.error(f"Failed to fetch release file: {e}")
-        return None
+# How long a cached release is trusted before revalidating it with GitHub.
+# Revalidation is a conditional request, so this can stay short
+RELEASE_CACHE_TTL = 10 * 60
+# owner/repo -> (time.monotonic() it was fetched at, release cache entry,
+# {asset name: asset}), shared by every caller in this process. The wall clock
+# is only used for the entries persisted to the cache file
+_releases = {}
+
+
+def _cache_release(owner_repo, fetched_at, entry):
+    # The asset index is built once here and replaced along with the release
+    assets = {a["name"]: a for a in entry["release"].get("assets", [])}
+    _releases[owner_repo] = (fetched_at, entry, assets)
 
 
-def get_release_version(repo_url):
+def get_latest_release(repo: str, cache_file=None):
     """
-    Fetch the latest release version (tag name) from the GitHub repo.
-    Returns the tag name as a string, or None if not found.
+    Fetch the latest release metadata from the GitHub repo in a single request.
+    Accepts either "owner/repo" or the full repo URL.
+    If `cache_file` is given, the release is cached there: within RELEASE_CACHE_TTL
+    no request is made, and after that GitHub is asked with the stored ETag so an
+    unchanged release only costs a 304.
+    Returns the release JSON as a dict, or None if it could not be fetched.
     """
-    repo_url = repo_url.rstrip("/")
-    owner_repo = repo_url.replace("https://github.com/", "")
-    api_url = f"https://api.github.com/repos/{owner_repo}/releases/latest"
+    owner_repo = repo.rstrip("/").replace("https://github.com/", "")
+    url = f"https://api.github.com/repos/{owner_repo}/releases/latest"
+    # A fresh release fetched earlier in this run is reused without touching
+    # the cache file
+    fetched_at, cached, _ = _releases.get(owner_repo, (None, None, None))
+    if cached and time.monotonic() - fetched_at < RELEASE_CACHE_TTL:
+        logging.debug("Using cached release info for %s", owner_repo)
+        return cached["release"]
+    cache = _read_release_cache(cache_file) if cache_file else {}
+    # Without a cache file the stale in-memory entry still provides the ETag
+    cached = cache.get(owner_repo) or cached
+    age = time.time() - cached.get("fetched_at", 0) if cached else None
+    if age is not None and 0 <= age < RELEASE_CACHE_TTL:
+        _cache_release(owner_repo, time.monotonic() - age, cached)
+        logging.debug("Using cached release info for %s", owner_repo)
+        return cached["release"]
+    headers = {}
+    if cached and cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
     try:
-        response = session.get(api_url, timeout=15)
-        if response.status_code != 200:
+        response = session.get(url, headers=headers, timeout=15)
+        etag = response.headers.get("ETag")
+        if response.status_code == 304 and cached:
+            logging.debug("Release info for %s not modified", owner_repo)
+            release = cached["release"]
+            etag = etag or cached.get("etag")
+        elif response.status_code != 200:
             logging.warning(
                 f"Failed to fetch release info, status code: {response.status_code}"
             )
             return None
-        release = response.json()
-        tag_name = release.get("tag_name")
-        if tag_name:
-            # Remove leading 'v' if present (e.g., v2.0.0 -> 2.0.0)
-            return tag_name.lstrip("v")
+        else:
+            release = json_utils.loads(response.content)
+        entry = {"etag": etag, "fetched_at": time.time(), "release": release}
+        _cache_release(owner_repo, time.monotonic(), entry)
+        if cache_file:
+            cache[owner_repo] = entry
+            _write_release_cache(cache_file, cache)
+        return release
+    except Exception as e:
+        logging.error(f"Error fetching latest release: {e}")
         return None
+
+
+def _read_release_cache(cache_file):
+    try:
+        return json_utils.load(cache_file)
+    except FileNotFoundError:
+        return {}
     except Exception as e:
-        logging.error(f"Error fetching latest release version: {e}")
+        logging.warning(f"Ignoring unreadable release cache {cache_file}: {e}")
+        return {}
+
+
+def _write_release_cache(cache_file, cache):
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        json_utils.dump(cache, cache_file)
+    except Exception as e:
+        logging.warning(f"Failed to write release cache {cache_file}: {e}")
+
+
+def _find_asset(release, file_name):
+    """Return the release asset called file_name, or None, using the cached index when the release is cached"""
+    for _, entry, assets in list(_releases.values()):
+        if entry["release"] is release:
+            return assets.get(file_name)
+    return next((a for a in release.get("assets", []) if a["name"] == file_name), None)
+
+
+def get_release_file(file_name: str, repo: str, release=None):
+    try:
+        data = release if release is not None else get_latest_release(repo)
+        if data is None:
+            return None
+        asset = _find_asset(data, file_name)
+        if asset is not None:
+            file_response = session.get(asset["browser_download_url"])
+            file_response.raise_for_status()
+            return file_response.content
+        logging.warning(f"File '{file_name}' not found in the latest release.")
+        return None
+    except requests.RequestException as e:
+        logging.error(f"Failed to fetch release file: {e}")
         return None
 
 
-def fetch_all(repo_url, folder, branch="main"):
+def download_release_file(file_name: str, repo: str, dest, release=None):
     """
-    Recursively get all file paths inside the specified folder of a GitHub repo using the tree API.
-    Returns a list of file paths (relative to repo root).
+    Download a release asset to dest, skipping the transfer if it hasn't changed.
+    When the release lists a SHA-256 digest for the asset, a matching local file is
+    kept without any request. Otherwise the asset's ETag is kept in "<dest>.etag"
+    and sent as If-None-Match next time, so an unchanged asset only costs a 304.
+    Returns True if dest was written, False if it was already up to date,
+    or None if the asset could not be downloaded.
     """
-    repo_url = repo_url.rstrip("/")
-    owner_repo = repo_url.replace("https://github.com/", "")
+    etag_file = f"{dest}.etag"
     try:
-        # 1. Get branch info to find commit SHA
-        branch_url = f"https://api.github.com/repos/{owner_repo}/branches/{branch}"
-        branch_resp = session.get(branch_url, timeout=15)
-        branch_resp.raise_for_status()
-        commit_sha = branch_resp.json()["commit"]["sha"]
-
-        # 2. Get the full tree recursively
-        tree_url = f"https://api.github.com/repos/{owner_repo}/git/trees/{commit_sha}?recursive=1"
-        tree_resp = session.get(tree_url, timeout=15)
-        tree_resp.raise_for_status()
-        tree = tree_resp.json()["tree"]
-
-        # 3. Collect all files (blobs) under the given folder (recursively)
-        files = [item["path"] for item in tree if item["type"] == "blob" and item["path"].startswith(f"{folder}/")]
-        return files
+        data = release if release is not None else get_latest_release(repo)
+        if data is None:
+            return None
+        asset = _find_asset(data, file_name)
+        if asset is None:
+            logging.warning(f"File '{file_name}' not found in the latest release.")
+            return None
+        digest = asset.get("digest") or ""
+        if digest.startswith("sha256:") and os.path.exists(dest):
+            if file_utils.sha256(dest) == digest[len("sha256:"):]:
+                logging.debug("%s matches the release digest", file_name)
+                return False
+        headers = {}
+        if os.path.exists(dest) and os.path.exists(etag_file):
+            with open(etag_file, "r", encoding="utf-8") as f:
+                headers["If-None-Match"] = f.read().strip()
+        with session.get(
+            asset["browser_download_url"], headers=headers, stream=True, timeout=30
+        ) as response:
+            if response.status_code == 304:
+                logging.debug("%s is already up to date", file_name)
+                return False
+            response.raise_for_status()
+            with file_utils.atomic_write(dest) as f:
+                for chunk in response.iter_content(1024 * 1024):
+                    file_utils.raise_if_cancelled()
+                    f.write(chunk)
+            etag = response.headers.get("ETag")
+        if etag:
+            with open(etag_file, "w", encoding="utf-8") as f:
+                f.write(etag)
+        return True
     except Exception as e:
-        logging.error(f"Error fetching config files recursively: {e}")
-        return []
+        logging.error(f"Failed to download release file {file_name}: {e}")
+        return None
+
+
+def get_release_version(repo_url, release=None):
+    """
+    Fetch the latest release version (tag name) from the GitHub repo.
+    Pass an already fetched `release` to avoid another request.
+    Returns the tag name as a string, or None if not found.
+    """
+    release = release if release is not None else get_latest_release(repo_url)
+    if release is None:
+        return None
+    tag_name = release.get("tag_name")
+    if tag_name:
+        # Remove leading 'v' if present (e.g., v2.0.0 -> 2.0.0)
+        return tag_name.lstrip("v")
+    return None
+
+
+def get_branch_head_sha(repo_url, branch="main"):
+    """
+    Return the commit SHA the branch points at.
+    Asks for the plain SHA media type, so the response is just the 40 characters.
+    """
+    owner_repo = repo_url.rstrip("/").replace("https://github.com/", "")
+    url = f"https://api.github.com/repos/{owner_repo}/commits/{branch}"
+    response = session.get(
+        url, headers={"Accept": "application/vnd.github.sha"}, timeout=15
+    )
+    response.raise_for_status()
+    return response.text.strip()
+
+
+# (owner/repo, branch) -> {path: {"sha", "size"}}, fetched once per run
+_tree_cache = {}
+_tree_locks = {}
+_tree_locks_guard = threading.Lock()
+
+
+def get_repo_tree(repo_url, branch="main"):
+    """
+    Return every file in the repo as {path: {"sha": ..., "size": ...}} using a
+    single recursive Trees API call. The tree is fetched once per repo and branch
+    and shared by every caller, including concurrent ones.
+    """
+    owner_repo = repo_url.rstrip("/").replace("https://github.com/", "")
+    key = (owner_repo, branch)
+    with _tree_locks_guard:
+        lock = _tree_locks.setdefault(key, threading.Lock())
+    with lock:
+        if key not in _tree_cache:
+            # The Trees API resolves the branch name itself, no branch lookup needed
+            tree_url = f"https://api.github.com/repos/{owner_repo}/git/trees/{branch}?recursive=1"
+            tree_resp = session.get(tree_url, timeout=15)
+            tree_resp.raise_for_status()
+            _tree_cache[key] = {
+                item["path"]: {"sha": item["sha"], "size": item.get("size")}
+                for item in json_utils.loads(tree_resp.content)["tree"]
+                if item["type"] == "blob"
+            }
+        return _tree_cache[key]
 
 
 def download_repo_file(repo_url, file_path, branch="main", dest=None):
@@ -101,11 +262,92 @@ def download_repo_file(repo_url, file_path, branch="main", dest=None):
     repo_url = repo_url.rstrip("/")
     owner_repo = repo_url.replace("https://github.com/", "")
     raw_url = f"https://raw.githubusercontent.com/{owner_repo}/{branch}/{file_path}"
-    resp = session.get(raw_url, timeout=15)
-    resp.raise_for_status()
+    file_utils.raise_if_cancelled()
     if dest:
-        dest.parent.mkdir(parents=True, exist_ok=True)
-        with open(dest, "wb") as f:
-            f.write(resp.content)
+        # Stream to disk so the file never has to fit in memory
+        with session.get(raw_url, stream=True, timeout=15) as resp:
+            resp.raise_for_status()
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            with file_utils.atomic_write(dest) as f:
+                for chunk in resp.iter_content(1024 * 1024):
+                    file_utils.raise_if_cancelled()
+                    f.write(chunk)
         return dest
+    resp = session.get(raw_url, timeout=15)
+    resp.raise_for_status()
     return resp.content
+
+
+def download_repo_files(repo_url, files, branch="main", on_done=None):
+    """
+    Download several files from a GitHub repo concurrently over the shared session.
+    `files` maps each repo path to its local destination Path.
+    `on_done`, if given, is called with each repo path as soon as it is written.
+    Returns the list of written destinations.
+    """
+    if not files:
+        return []
+    workers = min(MAX_PARALLEL_DOWNLOADS, len(files))
+    written = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(download_repo_file, repo_url, file, branch, dest): file
+            for file, dest in files.items()
+        }
+        for future in as_completed(futures):
+            written.append(future.result())
+            if on_done:
+                on_done(futures[future])
+    return written
+
+
+def extract_repo_archive(repo_url, branch, targets, exclude=()):
+    """
+    Download the repo once as a tarball and extract only the selected paths.
+    `targets` maps a repo path (a folder or a single file) to its local destination.
+    Repo paths starting with any prefix in `exclude` are skipped.
+    The archive is decompressed while it streams, so it never sits in memory or on disk.
+    Returns the number of files extracted.
+    """
+    repo_url = repo_url.rstrip("/")
+    owner_repo = repo_url.replace("https://github.com/", "")
+    # codeload serves archives straight from GitHub's CDN, without the API
+    # redirect and outside the API rate limit
+    tarball_url = f"https://codeload.github.com/{owner_repo}/tar.gz/{branch}"
+    extracted = 0
+    # Folders already created, so each is made once rather than once per file
+    made = set()
+    with session.get(tarball_url, stream=True, timeout=60) as response:
+        response.raise_for_status()
+        with tarfile.open(fileobj=response.raw, mode="r|gz") as tar:
+            for member in tar:
+                file_utils.raise_if_cancelled()
+                if not member.isfile():
+                    continue
+                # Strip the "<owner>-<repo>-<sha>/" root folder GitHub adds
+                path = member.name.split("/", 1)[-1]
+                if path.startswith(exclude):
+                    continue
+                dest = _archive_destination(path, targets)
+                if dest is None:
+                    continue
+                if dest.parent not in made:
+                    dest.parent.mkdir(parents=True, exist_ok=True)
+                    made.add(dest.parent)
+                with tar.extractfile(member) as source, file_utils.atomic_write(dest) as target:
+                    shutil.copyfileobj(source, target, 1024 * 1024)
+                extracted += 1
+    logging.info("Extracted %d files from %s@%s", extracted, owner_repo, branch)
+    return extracted
+
+
+def _archive_destination(path, targets):
+    if ".." in path.split("/"):
+        return None
+    local_path = targets.get(path)
+    if local_path is not None:
+        return Path(local_path)
+    for repo_path, local_path in targets.items():
+        if path.startswith(f"{repo_path}/"):
+            return Path(local_path) / path[len(repo_path) + 1 :]
+    return None
@@ -0,0 +1,54 @@
+import json
+import os
+from .file_utils import atomic_write
+
+# orjson parses and encodes several times faster; it's optional and the
+# standard library is used when it isn't installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads(data):
+    """Parse JSON from bytes or str"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(data, indent=False):
+    """Encode data as UTF-8 JSON bytes, indented by two spaces if `indent` is set"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0)
+    if indent:
+        return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+    # Compact separators, like orjson's output
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def load(path):
+    """Read and parse a JSON file"""
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+def dump(data, path, indent=False):
+    """Write data to a JSON file atomically, unless it already holds the same JSON"""
+    content = dumps(data, indent)
+    if _holds(path, content):
+        return
+    with atomic_write(path) as f:
+        f.write(content)
+
+
+def _holds(path, content):
+    # These files are small, so reading one back is cheaper than rewriting it;
+    # the size check skips the read when it can't match
+    try:
+        if os.path.getsize(path) != len(content):
+            return False
+        with open(path, "rb") as f:
+            return f.read() == content
+    except OSError:
+        return False
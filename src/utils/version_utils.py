@@ -1,10 +1,42 @@
-import requests
+import logging
+import os
+import re
+from functools import lru_cache
+from . import file_utils, json_utils
 
 
-def get_version_json(version):
+@lru_cache(maxsize=None)
+def get_version_json(version, cache_dir=None):
+    # Cached for the process: the install and the launch both need it, and a
+    # released version's JSON doesn't change. Callers must not modify it.
+    # With a cache_dir it's also kept on disk, so later runs don't need the
+    # manifest or the version request at all
+    cache_file = os.path.join(cache_dir, f"{version}.json") if cache_dir else None
+    if cache_file:
+        try:
+            return json_utils.load(cache_file)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logging.warning("Ignoring unreadable version cache %s: %s", cache_file, e)
     manifest_url = "https://launchermeta.mojang.com/mc/game/version_manifest.json"
-    manifest = requests.get(manifest_url).json()
+    # Through the pooled session with its timeouts, so a stalled connection
+    # can't hang the launch and shutdown can cancel it
+    manifest = json_utils.loads(file_utils.download_bytes(manifest_url))
     for v in manifest["versions"]:
         if v["id"] == version:
-            return requests.get(v["url"]).json()
+            vjson = json_utils.loads(file_utils.download_bytes(v["url"]))
+            if cache_file:
+                try:
+                    os.makedirs(cache_dir, exist_ok=True)
+                    json_utils.dump(vjson, cache_file)
+                except OSError as e:
+                    logging.warning("Failed to cache %s: %s", cache_file, e)
+            return vjson
     raise Exception(f"Version {version} not found")
+
+
+@lru_cache(maxsize=512)
+def parse_version(version):
+    """Turn a version string like "v2.0.10" into a tuple of ints for ordering"""
+    return tuple(int(part) for part in re.findall(r"\d+", version))